@@ -1,214 +1,409 @@
 #!/usr/bin/env python3
-import argparse
+import os
 import sys
-from sql_searcher import SqlSearcher
-from typing import List, Dict
-from datetime import datetime
-from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 
+if TYPE_CHECKING:
+    import argparse
 
-def main():
-    parser = argparse.ArgumentParser(description="Управление SQL-скриптами")
-    subparsers = parser.add_subparsers(dest="command", help="Доступные команды")
-    
-    # Команда добавления скрипта
+
+# Значения общих параметров по умолчанию
+DEFAULT_METADATA_FILE = "scripts_metadata.json"
+DEFAULT_SCRIPTS_DIR = "."
+
+# Разделитель между записями при выводе списков скриптов
+SEPARATOR = "-" * 50 + "\n"
+
+# Глобальные параметры, принимающие значение (нужны для поиска команды в argv)
+GLOBAL_OPTIONS_WITH_VALUE = ("--metadata-file", "--scripts-dir")
+
+# Команды без опций, разбираемые без argparse: команда -> имена позиционных аргументов
+FAST_PATH_COMMANDS = {
+    "find-name": ("name",),
+    "find-category": ("category",),
+    "list-all": (),
+    "list-categories": (),
+}
+
+
+def _p_add(subparsers):
+    """Команда добавления скрипта."""
     add_parser = subparsers.add_parser("add", help="Добавить новый SQL-скрипт")
     add_parser.add_argument("--name", "-n", required=True, help="Название скрипта")
     add_parser.add_argument("--category", "-c", required=True, help="Категория скрипта")
     add_parser.add_argument("--description", "-d", required=True, help="Описание скрипта")
     add_parser.add_argument("--content", help="Содержимое SQL-скрипта")
     add_parser.add_argument("--file", "-f", help="Путь к файлу SQL-скрипта")
-    
-    # Команда поиска скрипта по имени
+
+
+def _p_find_name(subparsers):
+    """Команда поиска скрипта по имени."""
     find_name_parser = subparsers.add_parser("find-name", help="Найти скрипт по имени")
     find_name_parser.add_argument("name", help="Название скрипта")
-    
-    # Команда поиска скриптов по категории
+
+
+def _p_find_category(subparsers):
+    """Команда поиска скриптов по категории."""
     find_category_parser = subparsers.add_parser("find-category", help="Найти скрипты по категории")
     find_category_parser.add_argument("category", help="Категория скриптов")
-    
-    # Команда вывода всех скриптов
+
+
+def _p_list_all(subparsers):
+    """Команда вывода всех скриптов."""
     subparsers.add_parser("list-all", help="Вывести все скрипты")
-    
-    # Команда вывода всех категорий
+
+
+def _p_list_categories(subparsers):
+    """Команда вывода всех категорий."""
     subparsers.add_parser("list-categories", help="Вывести все категории")
-    
-    # Команда удаления скрипта
+
+
+def _p_delete(subparsers):
+    """Команда удаления скрипта."""
     delete_parser = subparsers.add_parser("delete", help="Удалить скрипт")
     delete_parser.add_argument("name", help="Название скрипта")
     delete_parser.add_argument("--delete-file", "-df", action="store_true", 
                               help="Удалить также файл скрипта")
-    
-    # Команда полнотекстового поиска
+
+
+def _p_search(subparsers):
+    """Команда полнотекстового поиска."""
     search_parser = subparsers.add_parser("search", help="Полнотекстовый поиск по скриптам")
     search_parser.add_argument("query", help="Поисковый запрос")
-    
-    # Команда обновления скрипта
+
+
+def _p_update(subparsers):
+    """Команда обновления скрипта."""
     update_parser = subparsers.add_parser("update", help="Обновить содержимое скрипта")
     update_parser.add_argument("name", help="Название скрипта")
     update_parser.add_argument("--content", help="Новое содержимое SQL-скрипта")
     update_parser.add_argument("--file", "-f", help="Путь к файлу с новым содержимым")
-    
-    # Команда просмотра истории версий скрипта
+
+
+def _p_history(subparsers):
+    """Команда просмотра истории версий скрипта."""
     history_parser = subparsers.add_parser("history", help="Просмотр истории версий скрипта")
     history_parser.add_argument("name", help="Название скрипта")
     history_parser.add_argument("--version", "-v", type=int, help="Номер версии для просмотра")
+
+
+# Построители подпарсеров в порядке их вывода в справке
+SUBPARSERS = {
+    "add": _p_add,
+    "find-name": _p_find_name,
+    "find-category": _p_find_category,
+    "list-all": _p_list_all,
+    "list-categories": _p_list_categories,
+    "delete": _p_delete,
+    "search": _p_search,
+    "update": _p_update,
+    "history": _p_history,
+}
+
+
+def _detect_command(argv: List[str]) -> Optional[str]:
+    """
+    Находит в аргументах командной строки имя команды.
     
-    # Общие параметры
-    parser.add_argument("--metadata-file", default="scripts_metadata.json", 
-                       help="Путь к файлу метаданных")
-    parser.add_argument("--scripts-dir", default=".", 
-                       help="Базовая директория для хранения скриптов")
+    Args:
+        argv: Аргументы командной строки без имени программы.
+        
+    Returns:
+        str или None: Имя команды или None, если команда не указана или неизвестна.
+    """
+    skip_value = False
+    for arg in argv:
+        if skip_value:
+            skip_value = False
+            continue
+        if arg in GLOBAL_OPTIONS_WITH_VALUE:
+            skip_value = True
+            continue
+        if arg.startswith("-"):
+            continue
+        return arg if arg in SUBPARSERS else None
+    return None
+
+
+def _parse_fast_path(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Разбирает простые вызовы вида `find-name <name>` без построения argparse.
     
-    args = parser.parse_args()
+    Args:
+        argv: Аргументы командной строки без имени программы.
+        
+    Returns:
+        SimpleNamespace или None: Разобранные аргументы или None, если вызов
+        требует полного разбора через argparse.
+    """
+    if not argv or argv[0] not in FAST_PATH_COMMANDS:
+        return None
     
-    if not args.command:
-        parser.print_help()
-        return
+    positional_names = FAST_PATH_COMMANDS[argv[0]]
+    values = argv[1:]
+    if len(values) != len(positional_names) or any(v.startswith("-") for v in values):
+        return None
     
-    searcher = SqlSearcher(metadata_file=args.metadata_file, scripts_dir=args.scripts_dir)
+    args = SimpleNamespace(command=argv[0], metadata_file=DEFAULT_METADATA_FILE,
+                           scripts_dir=DEFAULT_SCRIPTS_DIR)
+    for name, value in zip(positional_names, values):
+        setattr(args, name, value)
+    return args
+
+
+def build_parser(argv: List[str]) -> "argparse.ArgumentParser":
+    """
+    Создает парсер аргументов командной строки.
     
-    if args.command == "add":
-        if not args.content and not args.file:
-            print("Ошибка: необходимо указать либо содержимое скрипта (--content), либо путь к файлу (--file)")
-            return
-        
-        content = None
-        if args.content:
-            content = args.content
-        elif args.file:
-            try:
-                with open(args.file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except FileNotFoundError:
-                print(f"Ошибка: файл {args.file} не найден")
-                return
-        
-        success = searcher.add_script(
-            name=args.name,
-            category=args.category,
-            description=args.description,
-            script_content=content
-        )
+    Подпарсер строится только для указанной команды. Если команда не распознана
+    или запрошена справка, строятся все подпарсеры, чтобы вывод справки и
+    сообщения об ошибках не менялись.
+    
+    Args:
+        argv: Аргументы командной строки без имени программы.
         
-        if not success:
-            sys.exit(1)
+    Returns:
+        argparse.ArgumentParser: Парсер аргументов.
+    """
+    import argparse
     
-    elif args.command == "find-name":
-        script = searcher.find_script_by_name(args.name)
-        if script:
-            print_script_info(script)
-        else:
-            print(f"Скрипт с названием '{args.name}' не найден.")
-            sys.exit(1)
+    parser = argparse.ArgumentParser(description="Управление SQL-скриптами")
+    subparsers = parser.add_subparsers(dest="command", help="Доступные команды")
     
-    elif args.command == "find-category":
-        scripts = searcher.find_scripts_by_category(args.category)
-        if scripts:
-            for script in scripts:
-                print_script_info(script)
-                print("-" * 50)
-        else:
-            print(f"Скрипты в категории '{args.category}' не найдены.")
-            sys.exit(1)
+    command = _detect_command(argv)
+    if command is None or "-h" in argv or "--help" in argv:
+        for add_subparser in SUBPARSERS.values():
+            add_subparser(subparsers)
+    else:
+        SUBPARSERS[command](subparsers)
     
-    elif args.command == "list-all":
-        scripts = searcher.get_all_scripts()
-        if scripts:
-            for script in scripts:
-                print_script_info(script, include_content=False)
-                print("-" * 50)
-        else:
-            print("Скрипты не найдены.")
+    # Общие параметры
+    parser.add_argument("--metadata-file", default=DEFAULT_METADATA_FILE, 
+                       help="Путь к файлу метаданных")
+    parser.add_argument("--scripts-dir", default=DEFAULT_SCRIPTS_DIR, 
+                       help="Базовая директория для хранения скриптов")
     
-    elif args.command == "list-categories":
-        categories = searcher.get_all_categories()
-        if categories:
-            print("Доступные категории:")
-            for category in categories:
-                print(f"- {category}")
-        else:
-            print("Категории не найдены.")
+    return parser
+
+
+def _handle_add(args, searcher):
+    """Команда add: добавление скрипта."""
+    source = _resolve_content_source(
+        args, "Ошибка: необходимо указать либо содержимое скрипта (--content), либо путь к файлу (--file)")
+    if source is None:
+        return
+    content, source_file = source
     
-    elif args.command == "delete":
-        success = searcher.delete_script(args.name, delete_file=args.delete_file)
-        if not success:
-            sys.exit(1)
+    success = searcher.add_script(
+        name=args.name,
+        category=args.category,
+        description=args.description,
+        script_content=content,
+        source_file=source_file
+    )
     
-    elif args.command == "search":
-        scripts = searcher.search_in_scripts(args.query)
-        if scripts:
-            print(f"Найдено скриптов: {len(scripts)}")
-            for script in scripts:
-                print_script_info(script, include_content=False)
-                print("-" * 50)
+    if not success:
+        sys.exit(1)
+
+
+def _handle_find_name(args, searcher):
+    """Команда find-name: поиск скрипта по имени."""
+    script = searcher.find_script_by_name(args.name)
+    if script:
+        print_script_info(script)
+    else:
+        print(f"Скрипт с названием '{args.name}' не найден.")
+        sys.exit(1)
+
+
+def _handle_find_category(args, searcher):
+    """Команда find-category: поиск скриптов по категории."""
+    scripts = searcher.find_scripts_by_category(args.category)
+    if scripts:
+        out = sys.stdout.write
+        for script in scripts:
+            out(_format_script_info(script))
+            out(SEPARATOR)
+    else:
+        print(f"Скрипты в категории '{args.category}' не найдены.")
+        sys.exit(1)
+
+
+def _handle_list_all(args, searcher):
+    """Команда list-all: вывод всех скриптов."""
+    scripts = searcher.get_all_scripts(include_content=False)
+    if scripts:
+        out = sys.stdout.write
+        for script in scripts:
+            out(_format_script_info(script, include_content=False))
+            out(SEPARATOR)
+    else:
+        print("Скрипты не найдены.")
+
+
+def _handle_list_categories(args, searcher):
+    """Команда list-categories: вывод всех категорий."""
+    categories = searcher.get_all_categories()
+    if categories:
+        print("Доступные категории:")
+        for category in categories:
+            print(f"- {category}")
+    else:
+        print("Категории не найдены.")
+
+
+def _handle_delete(args, searcher):
+    """Команда delete: удаление скрипта."""
+    success = searcher.delete_script(args.name, delete_file=args.delete_file)
+    if not success:
+        sys.exit(1)
+
+
+def _handle_search(args, searcher):
+    """Команда search: полнотекстовый поиск."""
+    scripts = searcher.search_in_scripts(args.query, include_content=False)
+    if scripts:
+        print(f"Найдено скриптов: {len(scripts)}")
+        out = sys.stdout.write
+        for script in scripts:
+            out(_format_script_info(script, include_content=False))
+            out(SEPARATOR)
+    else:
+        print(f"Скрипты, содержащие '{args.query}', не найдены.")
+        sys.exit(1)
+
+
+def _handle_update(args, searcher):
+    """Команда update: обновление содержимого скрипта."""
+    source = _resolve_content_source(
+        args, "Ошибка: необходимо указать либо новое содержимое скрипта (--content), либо путь к файлу (--file)")
+    if source is None:
+        return
+    content, source_file = source
+    
+    success = searcher.update_script(args.name, content, source_file=source_file)
+    if not success:
+        sys.exit(1)
+
+
+def _handle_history(args, searcher):
+    """Команда history: просмотр истории версий скрипта."""
+    versions = searcher.get_script_history(args.name)
+    if not versions:
+        sys.exit(1)
+    
+    if args.version:
+        # Вывод конкретной версии
+        versions_by_number = {v["version"]: v for v in versions}
+        version_info = versions_by_number.get(args.version)
+        if version_info:
+            print(f"Версия {args.version} скрипта '{args.name}':")
+            print("-" * 50)
+            print(version_info["content"])
         else:
-            print(f"Скрипты, содержащие '{args.query}', не найдены.")
+            print(f"Версия {args.version} скрипта '{args.name}' не найдена.")
             sys.exit(1)
-    
-    elif args.command == "update":
-        if not args.content and not args.file:
-            print("Ошибка: необходимо указать либо новое содержимое скрипта (--content), либо путь к файлу (--file)")
-            return
-        
-        content = None
-        if args.content:
-            content = args.content
-        elif args.file:
-            try:
-                with open(args.file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except FileNotFoundError:
-                print(f"Ошибка: файл {args.file} не найден")
-                return
+    else:
+        # Вывод списка всех версий
+        print(f"История версий скрипта '{args.name}':")
+        for version in versions:
+            current = version.get("current", False)
+            print(f"- Версия {version['version']}{' (текущая)' if current else ''}")
+
+
+# Обработчики команд; ключи совпадают с ключами SUBPARSERS
+HANDLERS = {
+    "add": _handle_add,
+    "find-name": _handle_find_name,
+    "find-category": _handle_find_category,
+    "list-all": _handle_list_all,
+    "list-categories": _handle_list_categories,
+    "delete": _handle_delete,
+    "search": _handle_search,
+    "update": _handle_update,
+    "history": _handle_history,
+}
+
+
+def main():
+    # Частые простые вызовы разбираются без argparse
+    args = _parse_fast_path(sys.argv[1:])
+    if args is None:
+        parser = build_parser(sys.argv[1:])
+        args = parser.parse_args()
         
-        success = searcher.update_script(args.name, content)
-        if not success:
-            sys.exit(1)
+        if not args.command:
+            parser.print_help()
+            return
     
-    elif args.command == "history":
-        versions = searcher.get_script_history(args.name)
-        if not versions:
-            sys.exit(1)
+    # Сообщения SqlSearcher выводятся пользователю как прежде
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
+    from sql_searcher import SqlSearcher
+    searcher = SqlSearcher(metadata_file=args.metadata_file, scripts_dir=args.scripts_dir)
+    
+    HANDLERS[args.command](args, searcher)
+
+
+def _resolve_content_source(args, missing_message: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """
+    Определяет источник содержимого скрипта для команд add и update.
+    
+    Файл не читается: его путь передается в SqlSearcher, который копирует
+    файл в хранилище напрямую.
+    
+    Args:
+        args: Разобранные аргументы командной строки (--content и --file).
+        missing_message: Сообщение, если не указан ни один источник.
         
-        if args.version:
-            # Вывод конкретной версии
-            version_info = next((v for v in versions if v["version"] == args.version), None)
-            if version_info:
-                print(f"Версия {args.version} скрипта '{args.name}':")
-                print("-" * 50)
-                print(version_info["content"])
-            else:
-                print(f"Версия {args.version} скрипта '{args.name}' не найдена.")
-                sys.exit(1)
-        else:
-            # Вывод списка всех версий
-            print(f"История версий скрипта '{args.name}':")
-            for version in versions:
-                current = version.get("current", False)
-                print(f"- Версия {version['version']}{' (текущая)' if current else ''}")
+    Returns:
+        Tuple или None: Пара (содержимое, путь к файлу), в которой задан ровно
+        один элемент, или None при ошибке.
+    """
+    if args.content:
+        return args.content, None
+    if not args.file:
+        print(missing_message)
+        return None
+    if not os.path.isfile(args.file):
+        print(f"Ошибка: файл {args.file} не найден")
+        return None
+    return None, args.file
 
 
-def print_script_info(script, include_content=True):
-    """Выводит информацию о скрипте в консоль."""
-    print(f"Название: {script['name']}")
-    print(f"Категория: {script['category']}")
-    print(f"Описание: {script['description']}")
-    print(f"Путь: {script['path']}")
+def _format_script_info(script, include_content=True) -> str:
+    """Формирует текстовый блок с информацией о скрипте."""
+    parts = [
+        f"Название: {script['name']}",
+        f"Категория: {script['category']}",
+        f"Описание: {script['description']}",
+        f"Путь: {script['path']}",
+    ]
     
     if "version" in script:
-        print(f"Версия: {script['version']}")
+        parts.append(f"Версия: {script['version']}")
     
     if "created_at" in script:
-        print(f"Создан: {script['created_at']}")
+        parts.append(f"Создан: {script['created_at']}")
     
     if "updated_at" in script:
-        print(f"Обновлен: {script['updated_at']}")
+        parts.append(f"Обновлен: {script['updated_at']}")
     
     if include_content:
-        print("\nСодержимое:")
-        print("-" * 50)
-        print(script['content'])
+        parts.append("\nСодержимое:")
+        parts.append("-" * 50)
+        parts.append(script['content'])
+    
+    parts.append("")
+    return "\n".join(parts)
+
+
+def print_script_info(script, include_content=True):
+    """Выводит информацию о скрипте в консоль."""
+    # Весь блок выводится одной записью
+    sys.stdout.write(_format_script_info(script, include_content))
 
 
 def search_in_scripts(self, query: str) -> List[Dict]:
@@ -240,6 +435,9 @@ def update_script(self, name: str, new_content: str) -> bool:
     Returns:
         bool: True, если скрипт успешно обновлен, иначе False.
     """
+    from datetime import datetime
+    from pathlib import Path
+    
     script = self.find_script_by_name(name)
     if not script:
         return False
@@ -257,10 +455,11 @@ def update_script(self, name: str, new_content: str) -> bool:
         f.write(new_content)
         
     # Обновляем метаданные
+    now_iso = datetime.now().isoformat()
     for i, s in enumerate(self.metadata["scripts"]):
         if s["name"] == name:
             self.metadata["scripts"][i]["version"] = version
-            self.metadata["scripts"][i]["updated_at"] = datetime.now().isoformat()
+            self.metadata["scripts"][i]["updated_at"] = now_iso
             break
             
     self._save_metadata()
@@ -4,6 +4,7 @@
 """
 import os
 import sqlite3
+import sys
 from sql_searcher import SqlSearcher
 from db_executor import DbExecutor
 
@@ -149,15 +150,15 @@ def print_results(results):
         print("Запрос не вернул результатов.")
         return
     
-    # Выводим заголовки столбцов
-    columns = results[0].keys()
-    header = " | ".join(columns)
-    print(header)
-    print("-" * len(header))
+    # Заголовки столбцов
+    header = " | ".join(results[0].keys())
+    lines = [header, "-" * len(header)]
     
-    # Выводим данные
-    for row in results:
-        print(" | ".join(str(row[col]) for col in columns))
+    # Данные: значения строки идут в том же порядке, что и столбцы
+    lines.extend([" | ".join(map(str, row.values())) for row in results])
+    
+    # Все строки выводятся одной записью
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
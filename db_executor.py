@@ -5,44 +5,326 @@
 """
 import os
 import re
-from typing import Dict, List, Any, Optional, Union, Tuple
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, List, Any, Optional, Union, Tuple
 import sqlalchemy
 from sqlalchemy import create_engine, text
+from sqlalchemy.sql.elements import TextClause
 from sql_searcher import SqlSearcher
 
 
-class DbExecutor:
+# Максимальное число закэшированных объектов TextClause
+TEXT_CACHE_SIZE = 512
+
+# Число строк, выбираемых за один раз при потоковом чтении результата
+STREAM_BATCH_SIZE = 1000
+
+# Параметры вида @param_name и позиционные параметры ?. Строковые литералы,
+# идентификаторы в кавычках, комментарии и системные переменные @@name
+# сопоставляются целиком, чтобы символы ? и @ внутри них не принимались за параметры
+_PARAM_RE = re.compile(
+    r"(?<!\w)[Ee]'(?:[^'\\]|\\.|'')*'"      # строка с escape-последовательностями (E'...')
+    r"|'[^']*(?:''[^']*)*'"                 # строковый литерал ('' - экранированная кавычка)
+    r'|(?<![\w$])\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$'   # строка в долларовых кавычках (не часть идентификатора a$b$c)
+    r'|"[^"]*"'                             # идентификатор в двойных кавычках
+    r'|`[^`]*`'                             # идентификатор в обратных кавычках
+    r'|--[^\n]*'                            # однострочный комментарий
+    r'|/\*.*?\*/'                           # многострочный комментарий
+    r'|@@\w+'                               # системная переменная
+    r'|@(?P<name>\w+)'                      # именованный параметр
+    r'|(?P<qmark>\?)',                      # позиционный параметр
+    re.DOTALL,
+)
+
+# DML-запросы (с учетом начальных комментариев), которые можно выполнять пакетом
+_DML_RE = re.compile(r'^\s*(?:--[^\n]*\n\s*)*(?:INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _compiled_text(sql: str) -> TextClause:
+    """
+    Возвращает объект TextClause для SQL-запроса, кэшируя его по тексту запроса.
+    
+    Повторное выполнение одного и того же запроса не разбирает его заново
+    и не извлекает параметры привязки.
+    
+    Args:
+        sql: Нормализованный SQL-запрос.
+        
+    Returns:
+        TextClause: Объект запроса SQLAlchemy.
+    """
+    return text(sql)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _normalize_template(sql: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Переписывает параметры SQL-запроса в формат :param_name, кэшируя результат.
+    
+    Результат зависит только от текста запроса, поэтому повторные запросы
+    не сканируются заново.
+    
+    Args:
+        sql: Исходный SQL-запрос.
+        
+    Returns:
+        Tuple: Нормализованный SQL-запрос и имена параметров привязки,
+            заменивших позиционные параметры ?, в порядке их следования.
+    """
+    bind_names = []
+    
+    def replace(match: "re.Match") -> str:
+        name = match.group('name')
+        if name is not None:
+            return f':{name}'
+        if match.group('qmark') is None:
+            # Литерал или комментарий
+            return match.group(0)
+        param_name = f'param_{len(bind_names)}'
+        bind_names.append(param_name)
+        return f':{param_name}'
+    
+    return _PARAM_RE.sub(replace, sql), tuple(bind_names)
+
+
+class _BaseDbExecutor:
+    """
+    Общая часть синхронного и асинхронного исполнителей SQL-скриптов:
+    поиск скриптов через SqlSearcher и подготовка запросов к выполнению.
+    """
+
+    def __init__(self, searcher: Optional[SqlSearcher] = None,
+                 metadata_file: str = "scripts_metadata.json", scripts_dir: str = "."):
+        """
+        Инициализация SqlSearcher для поиска скриптов.
+        
+        Args:
+            searcher: Экземпляр SqlSearcher или None (будет создан новый).
+            metadata_file: Путь к файлу с метаданными скриптов (если searcher не указан).
+            scripts_dir: Базовая директория для хранения скриптов (если searcher не указан).
+        """
+        if searcher is None:
+            self.searcher = SqlSearcher(metadata_file=metadata_file, scripts_dir=scripts_dir)
+        else:
+            self.searcher = searcher
+    
+    @staticmethod
+    def _normalize_sql_and_params(sql: str, params: Optional[Union[Dict[str, Any], List[Any]]] = None
+                                  ) -> Tuple[str, Union[Dict[str, Any], List[Any]]]:
+        """
+        Приводит параметры SQL-запроса к формату :param_name для SQLAlchemy.
+        
+        Параметры @param_name заменяются на :param_name, а позиционные параметры ?
+        на :param_0, :param_1, ... за один проход по строке запроса. Строковые
+        литералы (включая E'...' и $$...$$), идентификаторы в кавычках,
+        комментарии и системные переменные @@name не изменяются. Разбор запроса
+        кэшируется по его тексту (см. _normalize_template).
+        
+        Args:
+            sql: SQL-запрос.
+            params: Параметры запроса (словарь или список значений для ?).
+            
+        Returns:
+            Tuple: Нормализованный SQL-запрос и параметры для него.
+            
+        Raises:
+            ValueError: Если параметров меньше, чем позиционных параметров ? в запросе.
+        """
+        if params is None:
+            params = {}
+        
+        # Запрос без параметров @name и ? переписывать не нужно
+        if '@' not in sql and '?' not in sql:
+            return sql, params
+        
+        sql_normalized, bind_names = _normalize_template(sql)
+        if not bind_names:
+            return sql_normalized, params
+        
+        # Если параметры переданы как словарь, для ? используем его значения по порядку
+        if isinstance(params, dict):
+            params_list = list(params.values())
+        else:
+            params_list = params if params else []
+        
+        if len(params_list) < len(bind_names):
+            raise ValueError(f"Недостаточно параметров: ожидается {len(bind_names)}, получено {len(params_list)}")
+        return sql_normalized, dict(zip(bind_names, params_list))
+    
+    @staticmethod
+    def _group_statements(statements: List[Tuple[str, Any]]) -> List[Tuple[str, List[Any]]]:
+        """
+        Объединяет идущие подряд одинаковые DML-запросы в пакеты.
+        
+        Пакет выполняется одним вызовом executemany вместо отдельного
+        обращения к базе данных на каждый запрос.
+        
+        Args:
+            statements: Список пар (нормализованный SQL-запрос, параметры).
+            
+        Returns:
+            List[Tuple]: Список пар (SQL-запрос, список наборов параметров).
+        """
+        groups = []
+        for sql, params in statements:
+            if groups and groups[-1][0] == sql and isinstance(params, dict) \
+                    and isinstance(groups[-1][1][0], dict) \
+                    and _DML_RE.match(sql) and 'returning' not in sql.lower():
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+        return groups
+    
+    @staticmethod
+    def _fetch_rows(result: sqlalchemy.engine.Result, materialize: bool) -> List[Dict]:
+        """
+        Выбирает все строки результата запроса.
+        
+        Args:
+            result: Результат выполнения запроса.
+            materialize: Если True, каждая строка копируется в словарь; иначе
+                возвращаются представления RowMapping без создания словаря
+                на каждую строку.
+            
+        Returns:
+            List[Dict]: Строки результата.
+        """
+        if materialize:
+            columns = result.keys()
+            return [dict(zip(columns, row)) for row in result.fetchall()]
+        return result.mappings().all()
+    
+    def _get_script_content(self, name: str) -> str:
+        """
+        Возвращает содержимое скрипта по его названию.
+        
+        Raises:
+            ValueError: Если скрипт не найден.
+        """
+        script = self.searcher.find_script_by_name(name)
+        if not script:
+            raise ValueError(f"Скрипт с названием '{name}' не найден.")
+        return script["content"]
+    
+    def _get_category_script_content(self, category: str, script_index: int) -> str:
+        """
+        Возвращает содержимое скрипта из категории по индексу.
+        
+        Raises:
+            ValueError: Если категория не найдена или индекс вне диапазона.
+        """
+        scripts = self.searcher.find_scripts_by_category(category)
+        if not scripts:
+            raise ValueError(f"Скрипты в категории '{category}' не найдены.")
+        
+        if script_index < 0 or script_index >= len(scripts):
+            raise ValueError(f"Индекс скрипта {script_index} вне диапазона [0, {len(scripts) - 1}].")
+        
+        return scripts[script_index]["content"]
+    
+    def _get_transaction_scripts(self, script_names: List[str],
+                                 params_list: Optional[List[Dict[str, Any]]] = None
+                                 ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Возвращает пары (содержимое скрипта, параметры) для транзакции.
+        
+        Raises:
+            ValueError: Если какой-либо скрипт не найден или число наборов
+                параметров не совпадает с числом скриптов.
+        """
+        if params_list is None:
+            params_list = [{}] * len(script_names)
+        
+        if len(script_names) != len(params_list):
+            raise ValueError("Количество скриптов и наборов параметров должно совпадать.")
+        
+        return [(self._get_script_content(name), params) for name, params in zip(script_names, params_list)]
+    
+    def _normalize_transaction(self, scripts: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, List[Any]]]:
+        """
+        Нормализует запросы транзакции и объединяет их в пакеты.
+        
+        Raises:
+            ValueError: Если для какого-либо скрипта недостаточно параметров.
+        """
+        statements = []
+        for i, (sql, params) in enumerate(scripts):
+            try:
+                statements.append(self._normalize_sql_and_params(sql, params))
+            except ValueError as e:
+                raise ValueError(f"Скрипт {i+1}: {e}") from e
+        return self._group_statements(statements)
+
+
+class DbExecutor(_BaseDbExecutor):
     """
     Класс для выполнения SQL-скриптов в базах данных.
     Использует SqlSearcher для поиска скриптов и SQLAlchemy для выполнения.
     """
 
     def __init__(self, connection_string: str, searcher: Optional[SqlSearcher] = None,
-                 metadata_file: str = "scripts_metadata.json", scripts_dir: str = "."):
+                 metadata_file: str = "scripts_metadata.json", scripts_dir: str = ".",
+                 pool_size: Optional[int] = None, max_overflow: Optional[int] = None,
+                 pool_recycle: Optional[int] = None, pool_pre_ping: Optional[bool] = None,
+                 poolclass: Optional[type] = None, **engine_kwargs: Any):
         """
         Инициализация DbExecutor.
         
+        Параметры пула передаются в create_engine только если заданы, поэтому
+        по умолчанию используются настройки SQLAlchemy для выбранного диалекта
+        (например, SQLite с NullPool или StaticPool не принимает pool_size).
+        При работе через PgBouncer в режиме transaction рекомендуется
+        poolclass=sqlalchemy.pool.NullPool: пулом соединений управляет PgBouncer.
+        
         Args:
             connection_string: Строка подключения к базе данных в формате SQLAlchemy.
             searcher: Экземпляр SqlSearcher или None (будет создан новый).
             metadata_file: Путь к файлу с метаданными скриптов (если searcher не указан).
             scripts_dir: Базовая директория для хранения скриптов (если searcher не указан).
+            pool_size: Число постоянно открытых соединений в пуле.
+            max_overflow: Число дополнительных соединений сверх pool_size.
+            pool_recycle: Время жизни соединения в секундах, после которого оно пересоздается.
+            pool_pre_ping: Проверять соединение перед выдачей из пула.
+            poolclass: Класс пула соединений (например, sqlalchemy.pool.NullPool).
+            **engine_kwargs: Прочие параметры для create_engine.
         """
-        self.connection_string = connection_string
-        self.engine = create_engine(connection_string)
+        pool_options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": pool_pre_ping,
+            "poolclass": poolclass,
+        }
+        engine_kwargs.update({key: value for key, value in pool_options.items() if value is not None})
         
-        if searcher is None:
-            self.searcher = SqlSearcher(metadata_file=metadata_file, scripts_dir=scripts_dir)
-        else:
-            self.searcher = searcher
+        super().__init__(searcher, metadata_file, scripts_dir)
+        self.connection_string = connection_string
+        self._engine_kwargs = engine_kwargs
+        # Engine создается при первом обращении к базе данных (см. свойство engine)
+        self._engine: Optional[sqlalchemy.engine.Engine] = None
     
-    def execute_script_by_name(self, name: str, params: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    @property
+    def engine(self) -> sqlalchemy.engine.Engine:
+        """Engine SQLAlchemy; создается при первом обращении."""
+        if self._engine is None:
+            self._engine = create_engine(self.connection_string, **self._engine_kwargs)
+        return self._engine
+    
+    def execute_script_by_name(self, name: str, params: Optional[Dict[str, Any]] = None,
+                               materialize: bool = True, autocommit: bool = False) -> List[Dict]:
         """
         Выполняет SQL-скрипт по его названию.
         
         Args:
             name: Название скрипта.
             params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
             
         Returns:
             List[Dict]: Результат выполнения запроса (для SELECT-запросов).
@@ -51,14 +333,11 @@ class DbExecutor:
             ValueError: Если скрипт не найден.
             sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
         """
-        script = self.searcher.find_script_by_name(name)
-        if not script:
-            raise ValueError(f"Скрипт с названием '{name}' не найден.")
-        
-        return self._execute_sql(script["content"], params)
+        return self._execute_sql(self._get_script_content(name), params, materialize, autocommit)
     
     def execute_script_from_category(self, category: str, script_index: int = 0, 
-                                    params: Optional[Dict[str, Any]] = None) -> List[Dict]:
+                                    params: Optional[Dict[str, Any]] = None,
+                                    materialize: bool = True, autocommit: bool = False) -> List[Dict]:
         """
         Выполняет SQL-скрипт из указанной категории по индексу.
         
@@ -66,6 +345,11 @@ class DbExecutor:
             category: Категория скриптов.
             script_index: Индекс скрипта в списке (по умолчанию 0 - первый скрипт).
             params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
             
         Returns:
             List[Dict]: Результат выполнения запроса (для SELECT-запросов).
@@ -74,22 +358,22 @@ class DbExecutor:
             ValueError: Если категория не найдена или индекс вне диапазона.
             sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
         """
-        scripts = self.searcher.find_scripts_by_category(category)
-        if not scripts:
-            raise ValueError(f"Скрипты в категории '{category}' не найдены.")
-        
-        if script_index < 0 or script_index >= len(scripts):
-            raise ValueError(f"Индекс скрипта {script_index} вне диапазона [0, {len(scripts) - 1}].")
-        
-        return self._execute_sql(scripts[script_index]["content"], params)
+        return self._execute_sql(self._get_category_script_content(category, script_index),
+                                 params, materialize, autocommit)
     
-    def execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    def execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None,
+                    materialize: bool = True, autocommit: bool = False) -> List[Dict]:
         """
         Выполняет произвольный SQL-запрос.
         
         Args:
             sql: SQL-запрос.
             params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
             
         Returns:
             List[Dict]: Результат выполнения запроса (для SELECT-запросов).
@@ -97,15 +381,21 @@ class DbExecutor:
         Raises:
             sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
         """
-        return self._execute_sql(sql, params)
+        return self._execute_sql(sql, params, materialize, autocommit)
     
-    def _execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    def _execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None,
+                     materialize: bool = True, autocommit: bool = False) -> List[Dict]:
         """
         Внутренний метод для выполнения SQL-запроса.
         
         Args:
             sql: SQL-запрос.
             params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
             
         Returns:
             List[Dict]: Результат выполнения запроса (для SELECT-запросов).
@@ -113,51 +403,102 @@ class DbExecutor:
         Raises:
             sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
         """
-        if params is None:
-            params = {}
+        with self.engine.connect() as connection:
+            if autocommit:
+                connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+                return self._execute_on(connection, sql, params, materialize)
+            
+            # В SQLAlchemy 2.0 незафиксированная транзакция откатывается
+            # при закрытии соединения, поэтому изменения фиксируются явно
+            rows = self._execute_on(connection, sql, params, materialize)
+            connection.commit()
+            return rows
+    
+    def _execute_on(self, connection: sqlalchemy.engine.Connection, sql: str,
+                    params: Optional[Dict[str, Any]] = None, materialize: bool = True) -> List[Dict]:
+        """
+        Выполняет SQL-запрос через указанное соединение.
         
-        # Преобразуем SQL-запрос для совместимости с различными форматами параметров
-        # Заменяем @param_name и :param_name на :param_name для SQLAlchemy
-        sql_normalized = sql
+        Args:
+            connection: Открытое соединение с базой данных.
+            sql: SQL-запрос.
+            params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как представления RowMapping.
+            
+        Returns:
+            List[Dict]: Результат выполнения запроса (для SELECT-запросов).
+        """
+        sql_normalized, params = self._normalize_sql_and_params(sql, params)
+        result = connection.execute(_compiled_text(sql_normalized), params)
         
-        # Заменяем параметры вида @param_name на :param_name
-        at_params = re.findall(r'@(\w+)', sql_normalized)
-        for param in at_params:
-            sql_normalized = sql_normalized.replace(f'@{param}', f':{param}')
+        # Если запрос возвращает результаты (SELECT)
+        if result.returns_rows:
+            return self._fetch_rows(result, materialize)
         
-        # Заменяем параметры вида ? на позиционные параметры :param_0, :param_1, ...
-        if '?' in sql_normalized:
-            question_marks = sql_normalized.count('?')
-            new_params = {}
-            
-            # Если параметры переданы как словарь, преобразуем их в список
-            if isinstance(params, dict):
-                params_list = list(params.values())
-            else:
-                params_list = params if params else []
-            
-            # Проверяем, что количество параметров совпадает с количеством ?
-            if len(params_list) < question_marks:
-                raise ValueError(f"Недостаточно параметров: ожидается {question_marks}, получено {len(params_list)}")
+        # Для запросов без результатов (INSERT, UPDATE, DELETE)
+        return []
+    
+    @contextmanager
+    def session(self) -> Iterator["_ScopedExecutor"]:
+        """
+        Открывает соединение, через которое выполняются все запросы внутри блока with.
+        
+        Позволяет выполнить серию запросов без получения соединения из пула
+        на каждый из них. Изменения фиксируются вызовом commit(); незафиксированные
+        изменения откатываются при выходе из блока.
+        
+        Yields:
+            _ScopedExecutor: Исполнитель, привязанный к открытому соединению.
+        """
+        with self.engine.connect() as connection:
+            yield _ScopedExecutor(self, connection)
+    
+    @contextmanager
+    def begin(self) -> Iterator["_ScopedExecutor"]:
+        """
+        Как session(), но все запросы блока with выполняются в одной транзакции:
+        она фиксируется при успешном выходе из блока и откатывается при исключении.
+        
+        Yields:
+            _ScopedExecutor: Исполнитель, привязанный к соединению с открытой транзакцией.
+        """
+        with self.engine.begin() as connection:
+            yield _ScopedExecutor(self, connection)
+    
+    def iter_sql(self, sql: str, params: Optional[Dict[str, Any]] = None,
+                 batch: int = STREAM_BATCH_SIZE) -> Iterator[Dict]:
+        """
+        Выполняет SQL-запрос и возвращает строки результата по мере их получения.
+        
+        В отличие от execute_sql результат не загружается в память целиком:
+        используется серверный курсор (если его поддерживает драйвер), строки
+        выбираются из базы данных порциями по batch штук. Соединение остается
+        занятым, пока итератор не будет исчерпан или закрыт.
+        
+        Args:
+            sql: SQL-запрос.
+            params: Параметры для подстановки в SQL-запрос.
+            batch: Число строк, выбираемых из базы данных за один раз.
             
-            # Заменяем ? на :param_0, :param_1, ... и создаем новый словарь параметров
-            for i in range(question_marks):
-                param_name = f'param_{i}'
-                sql_normalized = sql_normalized.replace('?', f':{param_name}', 1)
-                new_params[param_name] = params_list[i]
+        Yields:
+            Dict: Очередная строка результата (для SELECT-запросов).
             
-            params = new_params
+        Raises:
+            sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
+        """
+        sql_normalized, params = self._normalize_sql_and_params(sql, params)
         
         with self.engine.connect() as connection:
-            result = connection.execute(text(sql_normalized), params)
-            
-            # Если запрос возвращает результаты (SELECT)
+            connection = connection.execution_options(stream_results=True, yield_per=batch)
+            result = connection.execute(_compiled_text(sql_normalized), params)
             if result.returns_rows:
-                columns = result.keys()
-                return [dict(zip(columns, row)) for row in result.fetchall()]
-            
-            # Для запросов без результатов (INSERT, UPDATE, DELETE)
-            return []
+                for row in result:
+                    yield dict(row._mapping)
+    
+    def close(self) -> None:
+        """Закрывает все соединения пула. Вызывается при завершении работы с базой данных."""
+        if self._engine is not None:
+            self._engine.dispose()
     
     def get_connection(self) -> sqlalchemy.engine.Connection:
         """
@@ -183,58 +524,242 @@ class DbExecutor:
         Raises:
             ValueError: Если какой-либо скрипт не найден.
         """
-        if params_list is None:
-            params_list = [{}] * len(script_names)
+        scripts = self._get_transaction_scripts(script_names, params_list)
         
-        if len(script_names) != len(params_list):
-            raise ValueError("Количество скриптов и наборов параметров должно совпадать.")
+        # Выполняем транзакцию: при исключении блок with откатывает ее
+        try:
+            statements = self._normalize_transaction(scripts)
+            
+            with self.engine.begin() as connection:
+                for sql_normalized, batch in statements:
+                    statement = _compiled_text(sql_normalized)
+                    if len(batch) > 1:
+                        connection.execute(statement, batch)
+                    else:
+                        connection.execute(statement, batch[0])
+            return True
+        except Exception as e:
+            print(f"Ошибка при выполнении транзакции: {e}")
+            return False
+
+
+class _ScopedExecutor:
+    """
+    Выполняет скрипты через одно соединение DbExecutor (см. DbExecutor.session
+    и DbExecutor.begin).
+    """
+
+    def __init__(self, executor: DbExecutor, connection: sqlalchemy.engine.Connection):
+        self._executor = executor
+        self.connection = connection
+    
+    def execute_script_by_name(self, name: str, params: Optional[Dict[str, Any]] = None,
+                               materialize: bool = True) -> List[Dict]:
+        """Выполняет SQL-скрипт по его названию (см. DbExecutor.execute_script_by_name)."""
+        return self.execute_sql(self._executor._get_script_content(name), params, materialize)
+    
+    def execute_script_from_category(self, category: str, script_index: int = 0,
+                                     params: Optional[Dict[str, Any]] = None,
+                                     materialize: bool = True) -> List[Dict]:
+        """Выполняет SQL-скрипт из категории по индексу (см. DbExecutor.execute_script_from_category)."""
+        return self.execute_sql(self._executor._get_category_script_content(category, script_index),
+                                params, materialize)
+    
+    def execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None,
+                    materialize: bool = True) -> List[Dict]:
+        """Выполняет произвольный SQL-запрос (см. DbExecutor.execute_sql)."""
+        return self._executor._execute_on(self.connection, sql, params, materialize)
+    
+    def commit(self) -> None:
+        """Фиксирует текущую транзакцию соединения."""
+        self.connection.commit()
+    
+    def rollback(self) -> None:
+        """Откатывает текущую транзакцию соединения."""
+        self.connection.rollback()
+
+
+class AsyncDbExecutor(_BaseDbExecutor):
+    """
+    Асинхронный вариант DbExecutor на основе SQLAlchemy asyncio.
+    Независимые скрипты можно выполнять параллельно через asyncio.gather.
+    Требует асинхронный драйвер базы данных (например, postgresql+asyncpg://
+    или sqlite+aiosqlite://).
+    """
+
+    def __init__(self, connection_string: str, searcher: Optional[SqlSearcher] = None,
+                 metadata_file: str = "scripts_metadata.json", scripts_dir: str = ".",
+                 **engine_kwargs: Any):
+        """
+        Инициализация AsyncDbExecutor.
         
-        # Получаем содержимое всех скриптов
-        scripts = []
-        for name in script_names:
-            script = self.searcher.find_script_by_name(name)
-            if not script:
-                raise ValueError(f"Скрипт с названием '{name}' не найден.")
-            scripts.append(script["content"])
+        Args:
+            connection_string: Строка подключения к базе данных в формате SQLAlchemy
+                с асинхронным драйвером.
+            searcher: Экземпляр SqlSearcher или None (будет создан новый).
+            metadata_file: Путь к файлу с метаданными скриптов (если searcher не указан).
+            scripts_dir: Базовая директория для хранения скриптов (если searcher не указан).
+            **engine_kwargs: Параметры для create_async_engine (включая параметры пула).
+        """
+        # Импортируется здесь: модулю asyncio SQLAlchemy нужен пакет greenlet
+        from sqlalchemy.ext.asyncio import create_async_engine
         
-        # Выполняем транзакцию
-        with self.engine.begin() as connection:
-            try:
-                for i, (sql, params) in enumerate(zip(scripts, params_list)):
-                    # Используем тот же метод нормализации SQL, что и в _execute_sql
-                    sql_normalized = sql
-                    
-                    # Заменяем параметры вида @param_name на :param_name
-                    at_params = re.findall(r'@(\w+)', sql_normalized)
-                    for param in at_params:
-                        sql_normalized = sql_normalized.replace(f'@{param}', f':{param}')
-                    
-                    # Заменяем параметры вида ? на позиционные параметры :param_0, :param_1, ...
-                    if '?' in sql_normalized:
-                        question_marks = sql_normalized.count('?')
-                        new_params = {}
-                        
-                        # Если параметры переданы как словарь, преобразуем их в список
-                        if isinstance(params, dict):
-                            params_list_inner = list(params.values())
+        super().__init__(searcher, metadata_file, scripts_dir)
+        self.connection_string = connection_string
+        self.engine = create_async_engine(connection_string, **engine_kwargs)
+    
+    async def execute_script_by_name(self, name: str, params: Optional[Dict[str, Any]] = None,
+                                     materialize: bool = True, autocommit: bool = False) -> List[Dict]:
+        """
+        Выполняет SQL-скрипт по его названию.
+        
+        Args:
+            name: Название скрипта.
+            params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
+            
+        Returns:
+            List[Dict]: Результат выполнения запроса (для SELECT-запросов).
+            
+        Raises:
+            ValueError: Если скрипт не найден.
+            sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
+        """
+        return await self._execute_sql(self._get_script_content(name), params, materialize, autocommit)
+    
+    async def execute_script_from_category(self, category: str, script_index: int = 0,
+                                           params: Optional[Dict[str, Any]] = None,
+                                           materialize: bool = True, autocommit: bool = False) -> List[Dict]:
+        """
+        Выполняет SQL-скрипт из указанной категории по индексу.
+        
+        Args:
+            category: Категория скриптов.
+            script_index: Индекс скрипта в списке (по умолчанию 0 - первый скрипт).
+            params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
+            
+        Returns:
+            List[Dict]: Результат выполнения запроса (для SELECT-запросов).
+            
+        Raises:
+            ValueError: Если категория не найдена или индекс вне диапазона.
+            sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
+        """
+        return await self._execute_sql(self._get_category_script_content(category, script_index),
+                                       params, materialize, autocommit)
+    
+    async def execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None,
+                          materialize: bool = True, autocommit: bool = False) -> List[Dict]:
+        """
+        Выполняет произвольный SQL-запрос.
+        
+        Args:
+            sql: SQL-запрос.
+            params: Параметры для подстановки в SQL-запрос.
+            materialize: Если False, строки возвращаются как неизменяемые
+                представления RowMapping без копирования в словари.
+            autocommit: Выполнить запрос в режиме AUTOCOMMIT, без отдельных
+                обращений BEGIN/COMMIT к базе данных. Без него запрос выполняется
+                в транзакции, которая фиксируется после выполнения запроса.
+            
+        Returns:
+            List[Dict]: Результат выполнения запроса (для SELECT-запросов).
+            
+        Raises:
+            sqlalchemy.exc.SQLAlchemyError: При ошибке выполнения запроса.
+        """
+        return await self._execute_sql(sql, params, materialize, autocommit)
+    
+    async def _execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None,
+                           materialize: bool = True, autocommit: bool = False) -> List[Dict]:
+        """Внутренний метод для выполнения SQL-запроса (см. DbExecutor._execute_sql)."""
+        sql_normalized, params = self._normalize_sql_and_params(sql, params)
+        
+        async with self.engine.connect() as connection:
+            if autocommit:
+                connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            result = await connection.execute(_compiled_text(sql_normalized), params)
+            
+            # Если запрос возвращает результаты (SELECT)
+            rows = self._fetch_rows(result, materialize) if result.returns_rows else []
+            if not autocommit:
+                await connection.commit()
+            return rows
+    
+    async def execute_transaction(self, script_names: List[str],
+                                  params_list: Optional[List[Dict[str, Any]]] = None,
+                                  pipeline: bool = False) -> bool:
+        """
+        Выполняет несколько скриптов в одной транзакции.
+        
+        Args:
+            script_names: Список названий скриптов для выполнения.
+            params_list: Список параметров для каждого скрипта.
+            pipeline: Выполнять запросы в pipeline-режиме драйвера, если он его
+                поддерживает (psycopg 3). Экспериментальная возможность: работа
+                в pipeline-режиме через адаптер SQLAlchemy не проверялась тестами.
+            
+        Returns:
+            bool: True, если транзакция успешно выполнена, иначе False.
+            
+        Raises:
+            ValueError: Если какой-либо скрипт не найден.
+        """
+        scripts = self._get_transaction_scripts(script_names, params_list)
+        
+        # Выполняем транзакцию: при исключении блок async with откатывает ее
+        try:
+            statements = self._normalize_transaction(scripts)
+            
+            async with self.engine.begin() as connection:
+                async with self._pipeline(connection, pipeline):
+                    for sql_normalized, batch in statements:
+                        statement = _compiled_text(sql_normalized)
+                        if len(batch) > 1:
+                            await connection.execute(statement, batch)
                         else:
-                            params_list_inner = params if params else []
-                        
-                        # Проверяем, что количество параметров совпадает с количеством ?
-                        if len(params_list_inner) < question_marks:
-                            raise ValueError(f"Недостаточно параметров для скрипта {i+1}: ожидается {question_marks}, получено {len(params_list_inner)}")
-                        
-                        # Заменяем ? на :param_0, :param_1, ... и создаем новый словарь параметров
-                        for j in range(question_marks):
-                            param_name = f'param_{j}'
-                            sql_normalized = sql_normalized.replace('?', f':{param_name}', 1)
-                            new_params[param_name] = params_list_inner[j]
-                        
-                        params = new_params
-                    
-                    connection.execute(text(sql_normalized), params)
-                return True
-            except Exception as e:
-                print(f"Ошибка при выполнении транзакции: {e}")
-                # Транзакция будет автоматически отменена при выходе из блока with
-                return False 
\ No newline at end of file
+                            await connection.execute(statement, batch[0])
+            return True
+        except Exception as e:
+            print(f"Ошибка при выполнении транзакции: {e}")
+            return False
+    
+    @staticmethod
+    @asynccontextmanager
+    async def _pipeline(connection: Any, enabled: bool) -> AsyncIterator[None]:
+        """
+        Включает pipeline-режим драйвера на время блока async with.
+        
+        В pipeline-режиме (psycopg 3) запросы транзакции отправляются на сервер
+        друг за другом, не дожидаясь ответа на каждый из них. Если режим не
+        запрошен или драйвер его не поддерживает (например, asyncpg, который и так
+        передает пакеты executemany без ожидания ответов), блок выполняется без
+        изменений. Ветка psycopg 3 не проверялась тестами (нужен сервер PostgreSQL).
+        
+        Args:
+            connection: Открытое асинхронное соединение SQLAlchemy.
+            enabled: Включать ли pipeline-режим (см. execute_transaction).
+        """
+        if not enabled:
+            yield
+            return
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = getattr(raw_connection, "driver_connection", None)
+        if driver_connection is not None and hasattr(driver_connection, "pipeline"):
+            async with driver_connection.pipeline():
+                yield
+        else:
+            yield
+    
+    async def close(self) -> None:
+        """Закрывает все соединения пула."""
+        await self.engine.dispose()
@@ -1,7 +1,64 @@
-import json
+import bisect
+import logging
 import os
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+try:
+    # Необязательная зависимость: ускоряет чтение и запись метаданных
+    import orjson
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+# Длина n-грамм в поисковом индексе
+NGRAM_SIZE = 3
+# Разделитель полей в поисковом тексте (не встречается в запросах, поэтому
+# совпадение не может пересечь границу полей)
+SEARCH_FIELD_SEPARATOR = "\x00"
+
+
+def _loads_metadata(data: bytes) -> Dict:
+    """Разбирает метаданные из JSON (через orjson, если он установлен)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    import json
+    return json.loads(data.decode('utf-8'))
+
+
+def _dumps_metadata(metadata: Dict) -> bytes:
+    """Сериализует метаданные в JSON в UTF-8 (через orjson, если он установлен)."""
+    if orjson is not None:
+        return orjson.dumps(metadata, option=orjson.OPT_INDENT_2)
+    import json
+    return json.dumps(metadata, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _slugify(name: str) -> str:
+    """Возвращает имя файла скрипта и каталога его истории (пробелы заменяются на подчеркивания)."""
+    return name.replace(' ', '_').lower()
+
+
+def _read_text(path: Union[str, Path]) -> str:
+    """
+    Читает текстовый файл в UTF-8 одним вызовом read без текстовой обертки.
+    
+    Переводы строк \r\n и \r приводятся к \n, как при чтении в текстовом
+    режиме, но только если в файле есть символ \r.
+    """
+    with open(path, 'rb') as f:
+        content = f.read().decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Разбивает строку на множество n-грамм длины NGRAM_SIZE."""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
 
 
 class SqlSearcher:
@@ -10,36 +67,188 @@ class SqlSearcher:
     Позволяет хранить, искать и получать SQL-скрипты.
     """
 
-    def __init__(self, metadata_file: str = "scripts_metadata.json", scripts_dir: str = "."):
+    def __init__(self, metadata_file: str = "scripts_metadata.json", scripts_dir: str = ".",
+                 background_save: bool = False):
         """
         Инициализация SqlSearcher.
         
         Args:
             metadata_file: Путь к файлу с метаданными скриптов.
             scripts_dir: Базовая директория для хранения скриптов.
+            background_save: Записывать файл метаданных в фоновом потоке. Изменяющие
+                методы не ждут записи на диск, а несколько изменений подряд
+                записываются одной операцией; дождаться записи можно вызовом flush().
         """
         self.metadata_file = metadata_file
         self.scripts_dir = Path(scripts_dir)
         self.metadata = self._load_metadata()
+        self._rebuild_name_index()
+        self._rebuild_category_index()
+        
+        # Содержимое прочитанных файлов: путь -> ((st_mtime_ns, st_size), содержимое)
+        self._content_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        
+        # Хэш последнего записанного содержимого файла метаданных
+        self._saved_digest: Optional[bytes] = None
+        
+        # Фоновая запись метаданных: данные, ожидающие записи, и поток записи
+        self._background_save = background_save
+        self._save_condition = None
+        if background_save:
+            import threading
+            self._save_condition = threading.Condition()
+        self._pending_data: Optional[bytes] = None
+        self._writing = False
+        self._closing = False
+        self._writer = None
+        self._write_error: Optional[OSError] = None
+        
+        # Отсортированный список названий для поиска по префиксу (строится по запросу)
+        self._sorted_names: Optional[List[str]] = None
+        
+        # Поисковые тексты: название -> (содержимое файла, поисковый текст)
+        self._search_texts: Dict[str, Tuple[str, str]] = {}
+        # Индекс n-грамм строится только по вызову build_search_index
+        self._search_index: Optional[Dict[str, Set[str]]] = None
     
     def _load_metadata(self) -> Dict:
         """Загружает метаданные из файла или создает пустой словарь."""
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Ошибка при чтении файла метаданных {self.metadata_file}. Создаю новый.")
-                return {"scripts": []}
-        return {"scripts": []}
+        try:
+            return _loads_metadata(Path(self.metadata_file).read_bytes())
+        except FileNotFoundError:
+            return {"scripts": []}
+        except ValueError:
+            # json.JSONDecodeError и orjson.JSONDecodeError - подклассы ValueError
+            logger.error("Ошибка при чтении файла метаданных %s. Создаю новый.", self.metadata_file)
+            return {"scripts": []}
+    
+    def _rebuild_name_index(self) -> None:
+        """Перестраивает отображение названия скрипта в его индекс в метаданных."""
+        self._name_to_idx = {script["name"]: i for i, script in enumerate(self.metadata["scripts"])}
+    
+    def _rebuild_category_index(self) -> None:
+        """Перестраивает отображение категории в список метаданных ее скриптов."""
+        self._by_category: Dict[str, List[Dict]] = {}
+        for script in self.metadata["scripts"]:
+            self._by_category.setdefault(script["category"], []).append(script)
     
     def _save_metadata(self) -> None:
-        """Сохраняет метаданные в файл."""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+        """
+        Сохраняет метаданные в файл.
+        
+        Данные записываются во временный файл рядом с файлом метаданных и
+        атомарно подменяют его, поэтому сбой во время записи не повреждает
+        сохраненные ранее метаданные. Если метаданные не изменились с последнего
+        сохранения, файл не перезаписывается.
+        
+        При background_save метаданные сериализуются в вызывающем потоке, а
+        запись на диск выполняет фоновый поток (см. flush).
+        """
+        import hashlib
+        
+        data = _dumps_metadata(self.metadata)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._saved_digest and os.path.exists(self.metadata_file):
+            return
+        
+        if not self._background_save:
+            self._write_metadata(data)
+            # Хэш запоминается только после успешной записи, иначе повторное
+            # сохранение тех же метаданных было бы пропущено
+            self._saved_digest = digest
+            return
+        
+        # Фоновый поток сбрасывает хэш, если запись не удалась
+        self._saved_digest = digest
+        with self._save_condition:
+            # Более ранние незаписанные данные заменяются новыми
+            self._pending_data = data
+            if self._writer is None:
+                import atexit
+                import threading
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+            self._save_condition.notify_all()
+    
+    def _write_metadata(self, data: bytes) -> None:
+        """Атомарно записывает сериализованные метаданные в файл."""
+        tmp_file = f"{self.metadata_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.metadata_file)
+    
+    def _writer_loop(self) -> None:
+        """Записывает ожидающие метаданные в фоновом потоке."""
+        while True:
+            with self._save_condition:
+                while self._pending_data is None and not self._closing:
+                    self._save_condition.wait()
+                if self._pending_data is None:
+                    return
+                data, self._pending_data = self._pending_data, None
+                self._writing = True
+            try:
+                self._write_metadata(data)
+            except OSError as e:
+                # Ошибка передается вызывающему коду через flush
+                self._write_error = e
+                self._saved_digest = None
+            finally:
+                with self._save_condition:
+                    self._writing = False
+                    self._save_condition.notify_all()
+    
+    def flush(self) -> None:
+        """
+        Дожидается записи метаданных на диск.
+        
+        Нужен только при background_save; вызывается автоматически при
+        завершении программы.
+        
+        Raises:
+            OSError: Если фоновая запись метаданных завершилась ошибкой.
+        """
+        if self._save_condition is None:
+            return
+        with self._save_condition:
+            while self._pending_data is not None or self._writing:
+                self._save_condition.wait()
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    def close(self) -> None:
+        """
+        Дожидается записи метаданных и останавливает поток фоновой записи.
+        
+        После закрытия метаданные записываются синхронно, а SqlSearcher
+        больше не удерживается обработчиком завершения программы.
+        
+        Raises:
+            OSError: Если фоновая запись метаданных завершилась ошибкой.
+        """
+        # Последующие сохранения синхронны, даже если поток записи не запускался
+        self._background_save = False
+        self._closing = True
+        if self._writer is None:
+            return
+        import atexit
+        
+        try:
+            self.flush()
+        finally:
+            with self._save_condition:
+                self._save_condition.notify_all()
+            self._writer.join()
+            self._writer = None
+            atexit.unregister(self.flush)
     
     def add_script(self, name: str, category: str, description: str, 
-                  script_content: str = None, script_path: str = None) -> bool:
+                  script_content: str = None, script_path: str = None,
+                  source_file: str = None, timestamp: Optional[str] = None) -> bool:
         """
         Добавляет новый SQL-скрипт.
         
@@ -49,55 +258,153 @@ class SqlSearcher:
             description: Описание скрипта.
             script_content: Содержимое SQL-скрипта (если передается напрямую).
             script_path: Путь к файлу скрипта (если скрипт уже существует).
+            source_file: Путь к файлу, содержимое которого копируется в файл скрипта
+                без загрузки в память.
+            timestamp: Время создания в формате ISO (по умолчанию текущее). Позволяет
+                использовать одну метку времени для пакета добавляемых скриптов.
             
+        Returns:
+            bool: True, если скрипт успешно добавлен, иначе False.
+        """
+        if not self._add_script_entry(name, category, description, script_content,
+                                      script_path, source_file, timestamp):
+            return False
+        self._save_metadata()
+        return True
+    
+    def add_scripts(self, scripts: List[Dict]) -> int:
+        """
+        Добавляет несколько SQL-скриптов, сохраняя метаданные один раз.
+        
+        Args:
+            scripts: Список словарей с аргументами add_script (name, category,
+                description и необязательные script_content, script_path,
+                source_file, timestamp). Скрипты без timestamp получают
+                общую метку времени пакета.
+            
+        Returns:
+            int: Количество успешно добавленных скриптов.
+        """
+        timestamp = self._get_current_timestamp()
+        created_dirs: Set[Path] = set()
+        added = 0
+        for script in scripts:
+            script = dict(script)
+            script.setdefault("timestamp", timestamp)
+            if self._add_script_entry(**script, created_dirs=created_dirs):
+                added += 1
+        
+        if added:
+            self._save_metadata()
+        return added
+    
+    def _add_script_entry(self, name: str, category: str, description: str,
+                          script_content: str = None, script_path: str = None,
+                          source_file: str = None, timestamp: Optional[str] = None,
+                          created_dirs: Optional[Set[Path]] = None) -> bool:
+        """
+        Записывает файл скрипта и добавляет его в метаданные и индексы без
+        сохранения метаданных. Аргументы совпадают с add_script.
+        
+        Args:
+            created_dirs: Директории категорий, уже созданные в текущем пакете
+                (см. add_scripts); для них mkdir не вызывается повторно.
+        
         Returns:
             bool: True, если скрипт успешно добавлен, иначе False.
         """
         # Проверка на дубликаты
         if self._script_exists(name):
-            print(f"Скрипт с названием '{name}' уже существует.")
+            logger.warning("Скрипт с названием '%s' уже существует.", name)
             return False
         
         # Создание директории категории, если она не существует
         category_dir = self.scripts_dir / category
-        if not category_dir.exists():
+        if created_dirs is None or category_dir not in created_dirs:
             category_dir.mkdir(parents=True, exist_ok=True)
+            if created_dirs is not None:
+                created_dirs.add(category_dir)
         
         # Определение пути к файлу скрипта
         if script_path:
             file_path = Path(script_path)
         else:
-            # Создаем имя файла из названия скрипта (заменяем пробелы на подчеркивания)
-            file_name = f"{name.replace(' ', '_').lower()}.sql"
-            file_path = category_dir / file_name
+            file_path = category_dir / f"{_slugify(name)}.sql"
         
         # Запись содержимого скрипта в файл, если оно предоставлено
         if script_content:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(script_content)
+        elif source_file:
+            if not os.path.isfile(source_file):
+                logger.error("Ошибка: файл %s не найден.", source_file)
+                return False
+            self._copy_script_file(source_file, file_path)
         elif not file_path.exists():
-            print(f"Ошибка: файл {file_path} не существует, а содержимое скрипта не предоставлено.")
+            logger.error("Ошибка: файл %s не существует, а содержимое скрипта не предоставлено.", file_path)
             return False
         
+        # Запись могла не изменить st_mtime_ns, если файл был прочитан в тот же такт часов
+        self._content_cache.pop(str(file_path), None)
+        
         # Добавление метаданных
         script_info = {
             "name": name,
             "category": category,
             "description": description,
             "path": str(file_path),
-            "created_at": self._get_current_timestamp(),
+            "created_at": timestamp or self._get_current_timestamp(),
             "version": 1
         }
         
         self.metadata["scripts"].append(script_info)
-        self._save_metadata()
+        self._name_to_idx[name] = len(self.metadata["scripts"]) - 1
+        self._by_category.setdefault(category, []).append(script_info)
+        if self._sorted_names is not None:
+            bisect.insort(self._sorted_names, name)
+        self._reindex_script(script_info)
         
-        print(f"Скрипт '{name}' успешно добавлен в категорию '{category}'.")
+        logger.info("Скрипт '%s' успешно добавлен в категорию '%s'.", name, category)
         return True
     
+    @staticmethod
+    def _copy_script_file(source: Union[str, Path], destination: Union[str, Path]) -> None:
+        """
+        Копирует файл скрипта, не загружая его содержимое в память.
+        
+        Args:
+            source: Путь к исходному файлу.
+            destination: Путь к файлу назначения.
+        """
+        import shutil
+        
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            return
+        # shutil.copyfile копирует данные на уровне ОС (sendfile) или блоками
+        shutil.copyfile(source, destination)
+    
+    @staticmethod
+    def _same_file_content(first: Union[str, Path], second: Union[str, Path]) -> bool:
+        """
+        Сравнивает содержимое двух файлов блоками, не загружая их в память.
+        
+        Args:
+            first: Путь к первому файлу.
+            second: Путь ко второму файлу.
+            
+        Returns:
+            bool: True, если оба файла существуют и их содержимое совпадает.
+        """
+        import filecmp
+        
+        try:
+            return filecmp.cmp(first, second, shallow=False)
+        except FileNotFoundError:
+            return False
+    
     def _script_exists(self, name: str) -> bool:
         """Проверяет, существует ли скрипт с указанным названием."""
-        return any(script["name"] == name for script in self.metadata["scripts"])
+        return name in self._name_to_idx
     
     def find_script_by_name(self, name: str) -> Optional[Dict]:
         """
@@ -109,10 +416,33 @@ class SqlSearcher:
         Returns:
             Dict или None: Информация о скрипте или None, если скрипт не найден.
         """
-        for script in self.metadata["scripts"]:
-            if script["name"] == name:
-                return self._get_script_with_content(script)
-        return None
+        idx = self._name_to_idx.get(name)
+        if idx is None:
+            return None
+        return self._get_script_with_content(self.metadata["scripts"][idx])
+    
+    def complete_script_names(self, prefix: str) -> List[str]:
+        """
+        Возвращает названия скриптов, начинающиеся с указанного префикса.
+        
+        Подходит для автодополнения названий в командной строке.
+        
+        Args:
+            prefix: Начало названия скрипта.
+            
+        Returns:
+            List[str]: Отсортированный список подходящих названий.
+        """
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._name_to_idx)
+        
+        names = self._sorted_names
+        matches = []
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            matches.append(names[i])
+        return matches
     
     def find_scripts_by_category(self, category: str) -> List[Dict]:
         """
@@ -124,11 +454,7 @@ class SqlSearcher:
         Returns:
             List[Dict]: Список скриптов в указанной категории.
         """
-        scripts = []
-        for script in self.metadata["scripts"]:
-            if script["category"] == category:
-                scripts.append(self._get_script_with_content(script))
-        return scripts
+        return [self._get_script_with_content(script) for script in self._by_category.get(category, [])]
     
     def _get_script_with_content(self, script_info: Dict) -> Dict:
         """
@@ -140,21 +466,47 @@ class SqlSearcher:
         Returns:
             Dict: Метаданные скрипта с добавленным содержимым.
         """
-        result = script_info.copy()
+        return {**script_info, "content": self._read_content(script_info["path"])}
+    
+    def _read_content(self, path: str) -> str:
+        """
+        Возвращает содержимое файла скрипта.
+        
+        Содержимое берется из кэша, если время изменения и размер файла
+        не менялись с момента его чтения; иначе файл читается заново.
+        
+        Args:
+            path: Путь к файлу скрипта.
+            
+        Returns:
+            str: Содержимое файла или сообщение об ошибке, если файл не найден.
+        """
         try:
-            with open(script_info["path"], 'r', encoding='utf-8') as f:
-                result["content"] = f.read()
+            stat = os.stat(path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._content_cache.get(path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            content = _read_text(path)
+            self._content_cache[path] = (key, content)
+            return content
         except FileNotFoundError:
-            result["content"] = f"ОШИБКА: Файл {script_info['path']} не найден."
-        return result
+            self._content_cache.pop(path, None)
+            return f"ОШИБКА: Файл {path} не найден."
     
-    def get_all_scripts(self) -> List[Dict]:
+    def get_all_scripts(self, include_content: bool = True) -> List[Dict]:
         """
         Возвращает список всех скриптов.
         
+        Args:
+            include_content: Если False, возвращаются только метаданные
+                скриптов, без чтения их файлов.
+        
         Returns:
             List[Dict]: Список всех скриптов.
         """
+        if not include_content:
+            return [script.copy() for script in self.metadata["scripts"]]
         return [self._get_script_with_content(script) for script in self.metadata["scripts"]]
     
     def get_all_categories(self) -> List[str]:
@@ -164,7 +516,7 @@ class SqlSearcher:
         Returns:
             List[str]: Список всех категорий.
         """
-        return list(set(script["category"] for script in self.metadata["scripts"]))
+        return list(self._by_category)
     
     def delete_script(self, name: str, delete_file: bool = False) -> bool:
         """
@@ -177,78 +529,227 @@ class SqlSearcher:
         Returns:
             bool: True, если скрипт успешно удален, иначе False.
         """
-        for i, script in enumerate(self.metadata["scripts"]):
-            if script["name"] == name:
-                if delete_file:
-                    try:
-                        os.remove(script["path"])
-                    except FileNotFoundError:
-                        print(f"Предупреждение: файл {script['path']} не найден.")
-                
-                del self.metadata["scripts"][i]
-                self._save_metadata()
-                print(f"Скрипт '{name}' успешно удален.")
-                return True
+        idx = self._name_to_idx.get(name)
+        if idx is None:
+            logger.warning("Скрипт с названием '%s' не найден.", name)
+            return False
+        
+        script = self.metadata["scripts"][idx]
+        if delete_file:
+            try:
+                os.remove(script["path"])
+            except FileNotFoundError:
+                logger.warning("Предупреждение: файл %s не найден.", script["path"])
         
-        print(f"Скрипт с названием '{name}' не найден.")
-        return False
+        # Порядок скриптов сохраняется: на него опираются индексы скриптов
+        # в категории (DbExecutor.execute_script_from_category)
+        scripts = self.metadata["scripts"]
+        del scripts[idx]
+        del self._name_to_idx[name]
+        # Индексы последующих скриптов сдвинулись на единицу
+        for i in range(idx, len(scripts)):
+            self._name_to_idx[scripts[i]["name"]] = i
+        self._content_cache.pop(script["path"], None)
+        category_scripts = self._by_category[script["category"]]
+        category_scripts.remove(script)
+        if not category_scripts:
+            del self._by_category[script["category"]]
+        if self._sorted_names is not None:
+            del self._sorted_names[bisect.bisect_left(self._sorted_names, name)]
+        self._save_metadata()
+        self._unindex_script(name)
+        logger.info("Скрипт '%s' успешно удален.", name)
+        return True
     
-    def search_in_scripts(self, query: str) -> List[Dict]:
+    def search_in_scripts(self, query: str, include_content: bool = True) -> List[Dict]:
         """
         Полнотекстовый поиск по содержимому скриптов.
         
+        Поиск не зависит от регистра (с учетом Unicode, например "ß" и "SS").
+        Запрос ищется в поисковом тексте каждого скрипта; если построен индекс
+        n-грамм (см. build_search_index), проверяются только отобранные им скрипты.
+        
         Args:
             query: Поисковый запрос.
+            include_content: Если False, возвращаются только метаданные
+                найденных скриптов, без копирования содержимого.
             
         Returns:
             List[Dict]: Список скриптов, содержащих запрос.
         """
+        query_folded = query.casefold()
+        scripts = self.metadata["scripts"]
+        
+        candidates = None
+        query_ngrams = _ngrams(query_folded)
+        if self._search_index is not None and query_ngrams:
+            # Поисковые тексты измененных файлов переиндексируются
+            for script in scripts:
+                self._get_search_text(script)
+            postings = sorted((self._search_index.get(ngram, set()) for ngram in query_ngrams), key=len)
+            candidates = set.intersection(*postings)
+        
         results = []
-        for script in self.metadata["scripts"]:
-            script_with_content = self._get_script_with_content(script)
-            if query.lower() in script_with_content["content"].lower() or \
-               query.lower() in script_with_content["name"].lower() or \
-               query.lower() in script_with_content["description"].lower():
-                results.append(script_with_content)
+        for script in scripts:
+            if candidates is not None and script["name"] not in candidates:
+                continue
+            if query_folded in self._get_search_text(script):
+                results.append(self._get_script_with_content(script) if include_content else script.copy())
         return results
     
-    def update_script(self, name: str, new_content: str) -> bool:
+    def build_search_index(self) -> None:
+        """
+        Строит индекс n-грамм для search_in_scripts.
+        
+        Индекс ускоряет повторные запросы в долгоживущем процессе, но его
+        построение дороже одного поиска перебором, а память растет вместе с
+        объемом скриптов. Для разовых запросов (например, из CLI) он не нужен.
+        После построения индекс обновляется при добавлении, изменении и
+        удалении скриптов, а также при изменении файлов извне.
+        """
+        if self._search_index is not None:
+            return
+        
+        search_index: Dict[str, Set[str]] = {}
+        for script in self.metadata["scripts"]:
+            name = script["name"]
+            for ngram in _ngrams(self._get_search_text(script)):
+                search_index.setdefault(ngram, set()).add(name)
+        self._search_index = search_index
+    
+    def _get_search_text(self, script_info: Dict) -> str:
+        """
+        Возвращает поисковый текст скрипта.
+        
+        Поисковый текст - это содержимое, название и описание скрипта,
+        приведенные str.casefold к единому регистру и соединенные через
+        SEARCH_FIELD_SEPARATOR. Он кэшируется вместе с содержимым, из которого
+        построен, и строится заново, когда _read_content возвращает новое
+        содержимое файла; индекс n-грамм при этом обновляется.
+        
+        Args:
+            script_info: Метаданные скрипта.
+            
+        Returns:
+            str: Поисковый текст скрипта.
+        """
+        name = script_info["name"]
+        content = self._read_content(script_info["path"])
+        cached = self._search_texts.get(name)
+        if cached is not None and cached[0] is content:
+            return cached[1]
+        
+        search_text = SEARCH_FIELD_SEPARATOR.join((content, name, script_info["description"])).casefold()
+        if self._search_index is not None:
+            if cached is not None:
+                self._remove_ngrams(name, cached[1])
+            for ngram in _ngrams(search_text):
+                self._search_index.setdefault(ngram, set()).add(name)
+        self._search_texts[name] = (content, search_text)
+        return search_text
+    
+    def _reindex_script(self, script_info: Dict) -> None:
+        """
+        Обновляет скрипт в индексе n-грамм, если индекс построен.
+        
+        Args:
+            script_info: Метаданные скрипта.
+        """
+        if self._search_index is not None:
+            self._get_search_text(script_info)
+    
+    def _unindex_script(self, name: str) -> None:
+        """
+        Удаляет скрипт из индекса n-грамм и кэша поисковых текстов.
+        
+        Args:
+            name: Название скрипта.
+        """
+        cached = self._search_texts.pop(name, None)
+        if self._search_index is not None and cached is not None:
+            self._remove_ngrams(name, cached[1])
+    
+    def _remove_ngrams(self, name: str, search_text: str) -> None:
+        """
+        Удаляет скрипт из списков индекса для n-грамм его прежнего поискового текста.
+        
+        Args:
+            name: Название скрипта.
+            search_text: Поисковый текст, по которому скрипт был проиндексирован.
+        """
+        for ngram in _ngrams(search_text):
+            names = self._search_index.get(ngram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._search_index[ngram]
+    
+    def update_script(self, name: str, new_content: str = None, source_file: str = None,
+                      timestamp: Optional[str] = None) -> bool:
         """
         Обновляет содержимое скрипта, сохраняя предыдущую версию.
         
         Args:
             name: Название скрипта.
             new_content: Новое содержимое скрипта.
+            source_file: Путь к файлу с новым содержимым (копируется без загрузки в память).
+            timestamp: Время обновления в формате ISO (по умолчанию текущее).
             
         Returns:
-            bool: True, если скрипт успешно обновлен, иначе False.
+            bool: True, если скрипт успешно обновлен или его содержимое совпадает
+                с new_content или source_file (новая версия тогда не создается),
+                иначе False.
         """
-        script = self.find_script_by_name(name)
-        if not script:
-            print(f"Скрипт с названием '{name}' не найден.")
+        idx = self._name_to_idx.get(name)
+        if idx is None:
+            logger.warning("Скрипт с названием '%s' не найден.", name)
+            return False
+        
+        if new_content is None and source_file is None:
+            logger.error("Ошибка: не указано новое содержимое скрипта.")
+            return False
+        if source_file is not None and not os.path.isfile(source_file):
+            logger.error("Ошибка: файл %s не найден.", source_file)
             return False
+        
+        script_info = self.metadata["scripts"][idx]
+        
+        # Содержимое не изменилось: файл не перезаписывается, версия не меняется
+        if source_file is None:
+            unchanged = new_content == self._read_content(script_info["path"])
+        else:
+            unchanged = self._same_file_content(source_file, script_info["path"])
+        if unchanged:
+            logger.info("Содержимое скрипта '%s' не изменилось.", name)
+            return True
             
         # Сохраняем предыдущую версию
-        version = script.get("version", 0) + 1
-        history_dir = self.scripts_dir / "_history" / name.replace(' ', '_').lower()
+        version = script_info.get("version", 0) + 1
+        history_dir = self.scripts_dir / "_history" / _slugify(name)
         history_dir.mkdir(parents=True, exist_ok=True)
         
-        with open(history_dir / f"v{version-1}.sql", "w", encoding='utf-8') as f:
-            f.write(script["content"])
-            
+        # Оба файла записываются до изменения метаданных, поэтому сбой
+        # между записями не оставит метаданные с новой версией
+        history_path = history_dir / f"v{version-1}.sql"
+        try:
+            self._copy_script_file(script_info["path"], history_path)
+        except FileNotFoundError:
+            history_path.write_text(self._read_content(script_info["path"]), encoding='utf-8')
+        
         # Обновляем скрипт
-        with open(script["path"], "w", encoding='utf-8') as f:
-            f.write(new_content)
-            
-        # Обновляем метаданные
-        for i, s in enumerate(self.metadata["scripts"]):
-            if s["name"] == name:
-                self.metadata["scripts"][i]["version"] = version
-                self.metadata["scripts"][i]["updated_at"] = self._get_current_timestamp()
-                break
-                
+        if source_file is not None:
+            self._copy_script_file(source_file, script_info["path"])
+        else:
+            Path(script_info["path"]).write_text(new_content, encoding='utf-8')
+        self._content_cache.pop(script_info["path"], None)
+        
+        # Обновляем метаданные (сохраняются один раз в конце)
+        script_info["version"] = version
+        script_info["updated_at"] = timestamp or self._get_current_timestamp()
+        
         self._save_metadata()
-        print(f"Скрипт '{name}' успешно обновлен до версии {version}.")
+        self._reindex_script(script_info)
+        logger.info("Скрипт '%s' успешно обновлен до версии %s.", name, version)
         return True
     
     def get_script_history(self, name: str) -> List[Dict]:
@@ -263,25 +764,26 @@ class SqlSearcher:
         """
         script = self.find_script_by_name(name)
         if not script:
-            print(f"Скрипт с названием '{name}' не найден.")
+            logger.warning("Скрипт с названием '%s' не найден.", name)
             return []
         
-        history_dir = self.scripts_dir / "_history" / name.replace(' ', '_').lower()
-        if not history_dir.exists():
-            print(f"История для скрипта '{name}' не найдена.")
+        history_dir = self.scripts_dir / "_history" / _slugify(name)
+        try:
+            with os.scandir(history_dir) as entries:
+                paths = [entry.path for entry in entries
+                         if entry.name.startswith('v') and entry.name.endswith('.sql')]
+        except FileNotFoundError:
+            logger.warning("История для скрипта '%s' не найдена.", name)
             return []
         
-        versions = []
-        for version_file in sorted(history_dir.glob("v*.sql")):
-            version_num = int(version_file.stem[1:])
-            with open(version_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            versions.append({
-                "version": version_num,
-                "content": content,
-                "path": str(version_file)
-            })
+        versions = [
+            {
+                "version": int(os.path.basename(path)[1:-4]),
+                "content": _read_text(path),
+                "path": path
+            }
+            for path in paths
+        ]
         
         # Добавляем текущую версию
         versions.append({
@@ -294,6 +796,5 @@ class SqlSearcher:
         return sorted(versions, key=lambda x: x["version"])
     
     def _get_current_timestamp(self) -> str:
-        """Возвращает текущую дату и время в формате ISO."""
-        from datetime import datetime
-        return datetime.now().isoformat() 
\ No newline at end of file
+        """Возвращает текущую дату и время в формате ISO с точностью до секунды."""
+        return datetime.now().isoformat(timespec='seconds') 
\ No newline at end of file
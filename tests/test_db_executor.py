@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Тесты для класса DbExecutor.
+"""
+import importlib.util
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from db_executor import AsyncDbExecutor, DbExecutor
+from sql_searcher import SqlSearcher
+
+
+class TestNormalizeSqlAndParams(unittest.TestCase):
+    """Тесты приведения параметров SQL-запроса к формату SQLAlchemy."""
+    
+    def normalize(self, sql, params=None):
+        """Нормализует запрос через DbExecutor._normalize_sql_and_params."""
+        return DbExecutor._normalize_sql_and_params(sql, params)
+    
+    def test_named_and_positional_params(self):
+        """Тест замены параметров @name и ?."""
+        self.assertEqual(self.normalize("SELECT * FROM t WHERE id = @id", {"id": 1}),
+                         ("SELECT * FROM t WHERE id = :id", {"id": 1}))
+        self.assertEqual(self.normalize("SELECT * FROM t WHERE a = ? AND b = ?", [1, 2]),
+                         ("SELECT * FROM t WHERE a = :param_0 AND b = :param_1",
+                          {"param_0": 1, "param_1": 2}))
+        
+        # Значения словаря подставляются в ? по порядку
+        self.assertEqual(self.normalize("SELECT ?", {"x": 5}), ("SELECT :param_0", {"param_0": 5}))
+        
+        # Запрос без параметров не изменяется
+        self.assertEqual(self.normalize("SELECT 1"), ("SELECT 1", {}))
+    
+    def test_string_literals(self):
+        """Тест строковых литералов, содержащих ? и @."""
+        self.assertEqual(self.normalize("SELECT 'what?', ?", [1]),
+                         ("SELECT 'what?', :param_0", {"param_0": 1}))
+        self.assertEqual(self.normalize("SELECT 'it''s ? @x', ?", [1]),
+                         ("SELECT 'it''s ? @x', :param_0", {"param_0": 1}))
+        self.assertEqual(self.normalize(r"SELECT E'\'?', ?", [1]),
+                         (r"SELECT E'\'?', :param_0", {"param_0": 1}))
+    
+    def test_dollar_quoted_strings(self):
+        """Тест строк в долларовых кавычках."""
+        self.assertEqual(self.normalize("SELECT $$ ? $$, ?", [1]),
+                         ("SELECT $$ ? $$, :param_0", {"param_0": 1}))
+        self.assertEqual(self.normalize("SELECT $fn$ @x ? $fn$, @y", {"y": 1}),
+                         ("SELECT $fn$ @x ? $fn$, :y", {"y": 1}))
+        
+        # $b$ внутри идентификатора не открывает строку
+        self.assertEqual(self.normalize("SELECT a$b$c, ?, d$b$e FROM t", [1]),
+                         ("SELECT a$b$c, :param_0, d$b$e FROM t", {"param_0": 1}))
+    
+    def test_comments_and_quoted_identifiers(self):
+        """Тест комментариев и идентификаторов в кавычках."""
+        self.assertEqual(self.normalize("SELECT ? -- ?\nFROM t", [1]),
+                         ("SELECT :param_0 -- ?\nFROM t", {"param_0": 1}))
+        self.assertEqual(self.normalize("SELECT /* ? @x */ ?", [1]),
+                         ("SELECT /* ? @x */ :param_0", {"param_0": 1}))
+        self.assertEqual(self.normalize('SELECT "a?", `b?`, ?', [1]),
+                         ('SELECT "a?", `b?`, :param_0', {"param_0": 1}))
+    
+    def test_system_variables(self):
+        """Тест системных переменных @@name."""
+        self.assertEqual(self.normalize("SELECT @@version, @id", {"id": 1}),
+                         ("SELECT @@version, :id", {"id": 1}))
+    
+    def test_too_few_params(self):
+        """Тест ошибки при нехватке параметров для ?."""
+        with self.assertRaises(ValueError):
+            self.normalize("SELECT ?, ?", [1])
+        with self.assertRaises(ValueError):
+            self.normalize("SELECT ?")
+
+
+class TestGroupStatements(unittest.TestCase):
+    """Тесты для объединения запросов транзакции в пакеты executemany."""
+    
+    def group(self, statements):
+        """Объединяет запросы через DbExecutor._group_statements."""
+        return DbExecutor._group_statements(statements)
+    
+    def test_consecutive_dml(self):
+        """Тест объединения идущих подряд одинаковых DML-запросов."""
+        ins = "INSERT INTO t VALUES (:id)"
+        self.assertEqual(self.group([(ins, {"id": 1}), (ins, {"id": 2}), ("SELECT 1", {}), (ins, {"id": 3})]),
+                         [(ins, [{"id": 1}, {"id": 2}]), ("SELECT 1", [{}]), (ins, [{"id": 3}])])
+        
+        # Начальный комментарий не мешает распознать DML
+        upd = "-- обновление\nUPDATE t SET id = :id"
+        self.assertEqual(self.group([(upd, {"id": 1}), (upd, {"id": 2})]),
+                         [(upd, [{"id": 1}, {"id": 2}])])
+    
+    def test_not_grouped(self):
+        """Тест запросов, которые выполняются по отдельности."""
+        for sql in ("SELECT :id", "INSERT INTO t VALUES (:id) RETURNING id", "CREATE TABLE t (id INTEGER)"):
+            self.assertEqual(self.group([(sql, {"id": 1}), (sql, {"id": 2})]),
+                             [(sql, [{"id": 1}]), (sql, [{"id": 2}])])
+        
+        # Пакет собирается только из наборов параметров-словарей
+        ins = "INSERT INTO t VALUES (:id)"
+        self.assertEqual(self.group([(ins, [1]), (ins, [2])]), [(ins, [[1]]), (ins, [[2]])])
+
+
+class TestDbExecutor(unittest.TestCase):
+    """Тесты для класса DbExecutor (SQLite)."""
+    
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.test_dir = tempfile.mkdtemp()
+        searcher = SqlSearcher(metadata_file=os.path.join(self.test_dir, "metadata.json"),
+                               scripts_dir=self.test_dir)
+        searcher.add_script("Create", "ddl", "", script_content="CREATE TABLE t (id INTEGER PRIMARY KEY)")
+        searcher.add_script("Insert", "dml", "", script_content="INSERT INTO t VALUES (@id)")
+        searcher.add_script("Select", "dql", "", script_content="SELECT id FROM t ORDER BY id")
+        
+        db_path = os.path.join(self.test_dir, "test.db")
+        self.executor = DbExecutor(f"sqlite:///{db_path}", searcher=searcher)
+        self.executor.execute_script_by_name("Create")
+    
+    def tearDown(self):
+        """Очистка после тестов."""
+        self.executor.close()
+        shutil.rmtree(self.test_dir)
+    
+    def test_execute_transaction(self):
+        """Тест транзакции с пакетом одинаковых INSERT."""
+        success = self.executor.execute_transaction(
+            ["Insert", "Insert", "Insert"], [{"id": 1}, {"id": 2}, {"id": 3}])
+        self.assertTrue(success)
+        self.assertEqual(self.executor.execute_script_by_name("Select"), [{"id": 1}, {"id": 2}, {"id": 3}])
+    
+    def test_execute_transaction_rollback(self):
+        """Тест отката всей транзакции при ошибке в одном из запросов."""
+        with redirect_stdout(io.StringIO()) as output:
+            success = self.executor.execute_transaction(
+                ["Insert", "Insert", "Insert"], [{"id": 1}, {"id": 2}, {"id": 1}])
+        self.assertFalse(success)
+        self.assertIn("Ошибка при выполнении транзакции", output.getvalue())
+        self.assertEqual(self.executor.execute_script_by_name("Select"), [])
+        
+        # Ошибка в запросе после пакета откатывает и пакет
+        with redirect_stdout(io.StringIO()):
+            success = self.executor.execute_transaction(
+                ["Insert", "Insert", "Select", "Insert"], [{"id": 1}, {"id": 2}, {}, {"id": 2}])
+        self.assertFalse(success)
+        self.assertEqual(self.executor.execute_script_by_name("Select"), [])
+    
+    def test_iter_sql(self):
+        """Тест потокового чтения результата порциями."""
+        self.executor.execute_transaction(["Insert"] * 5, [{"id": i} for i in range(5)])
+        
+        rows = self.executor.iter_sql("SELECT id FROM t WHERE id >= @min ORDER BY id", {"min": 1}, batch=2)
+        self.assertEqual(next(rows), {"id": 1})
+        self.assertEqual(list(rows), [{"id": 2}, {"id": 3}, {"id": 4}])
+    
+    def test_materialize(self):
+        """Тест строк результата без копирования в словари."""
+        self.executor.execute_transaction(["Insert", "Insert"], [{"id": 1}, {"id": 2}])
+        
+        rows = self.executor.execute_script_by_name("Select", materialize=False)
+        self.assertNotIsInstance(rows[0], dict)
+        self.assertEqual(rows[0]["id"], 1)
+        self.assertEqual([dict(row) for row in rows], [{"id": 1}, {"id": 2}])
+    
+    def test_session(self):
+        """Тест серии запросов через одно соединение."""
+        with self.executor.session() as db:
+            db.execute_script_by_name("Insert", {"id": 1})
+            self.assertEqual(db.execute_script_from_category("dql"), [{"id": 1}])
+            db.commit()
+            db.execute_script_by_name("Insert", {"id": 2})
+        
+        # Изменения после commit() откатываются при выходе из блока
+        self.assertEqual(self.executor.execute_script_by_name("Select"), [{"id": 1}])
+    
+    def test_begin(self):
+        """Тест серии запросов в одной транзакции."""
+        with self.executor.begin() as db:
+            db.execute_script_by_name("Insert", {"id": 1})
+            db.execute_sql("INSERT INTO t VALUES (?)", [2])
+        self.assertEqual(self.executor.execute_script_by_name("Select"), [{"id": 1}, {"id": 2}])
+        
+        # Исключение в блоке откатывает всю транзакцию
+        with self.assertRaises(RuntimeError):
+            with self.executor.begin() as db:
+                db.execute_script_by_name("Insert", {"id": 3})
+                raise RuntimeError
+        self.assertEqual(self.executor.execute_script_by_name("Select"), [{"id": 1}, {"id": 2}])
+    
+    def test_lazy_engine(self):
+        """Тест создания engine при первом обращении к базе данных."""
+        executor = DbExecutor("sqlite://", searcher=self.executor.searcher)
+        self.assertIsNone(executor._engine)
+        
+        # close() без обращений к базе данных не создает engine
+        executor.close()
+        self.assertIsNone(executor._engine)
+        
+        self.assertEqual(executor.execute_sql("SELECT 1 AS x"), [{"x": 1}])
+        self.assertIs(executor.engine, executor._engine)
+        executor.close()
+    
+    def test_execute_sql_commits(self):
+        """Тест фиксации изменений одиночного запроса."""
+        self.assertEqual(self.executor.execute_script_by_name("Insert", {"id": 1}), [])
+        self.assertEqual(self.executor.execute_sql("INSERT INTO t VALUES (?)", [2], autocommit=True), [])
+        self.assertEqual(self.executor.execute_script_from_category("dql"), [{"id": 1}, {"id": 2}])
+
+
+@unittest.skipIf(importlib.util.find_spec("aiosqlite") is None, "нужен пакет aiosqlite")
+class TestAsyncDbExecutor(unittest.IsolatedAsyncioTestCase):
+    """Тесты для класса AsyncDbExecutor (SQLite через aiosqlite)."""
+    
+    async def asyncSetUp(self):
+        """Подготовка к тестам."""
+        self.test_dir = tempfile.mkdtemp()
+        searcher = SqlSearcher(metadata_file=os.path.join(self.test_dir, "metadata.json"),
+                               scripts_dir=self.test_dir)
+        searcher.add_script("Create", "ddl", "", script_content="CREATE TABLE t (id INTEGER)")
+        searcher.add_script("Insert", "dml", "", script_content="INSERT INTO t VALUES (@id)")
+        
+        db_path = os.path.join(self.test_dir, "test.db")
+        self.executor = AsyncDbExecutor(f"sqlite+aiosqlite:///{db_path}", searcher=searcher)
+    
+    async def asyncTearDown(self):
+        """Очистка после тестов."""
+        await self.executor.close()
+        shutil.rmtree(self.test_dir)
+    
+    async def test_execute_transaction(self):
+        """Тест транзакции с pipeline-режимом и без него."""
+        success = await self.executor.execute_transaction(
+            ["Create", "Insert", "Insert"], [{}, {"id": 1}, {"id": 2}])
+        self.assertTrue(success)
+        
+        # aiosqlite не поддерживает pipeline-режим: транзакция выполняется как обычно
+        success = await self.executor.execute_transaction(["Insert"], [{"id": 3}], pipeline=True)
+        self.assertTrue(success)
+        
+        rows = await self.executor.execute_sql("SELECT id FROM t ORDER BY id")
+        self.assertEqual(rows, [{"id": 1}, {"id": 2}, {"id": 3}])
+    
+    async def test_execute_sql_commits(self):
+        """Тест фиксации изменений одиночного запроса."""
+        await self.executor.execute_script_by_name("Create")
+        await self.executor.execute_script_by_name("Insert", {"id": 1})
+        await self.executor.execute_sql("INSERT INTO t VALUES (2)", autocommit=True)
+        
+        rows = await self.executor.execute_sql("SELECT id FROM t ORDER BY id")
+        self.assertEqual(rows, [{"id": 1}, {"id": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -71,6 +71,106 @@ class TestSqlSearcher(unittest.TestCase):
         self.assertEqual(script["description"], "New description")
         self.assertEqual(script["content"], "INSERT INTO test VALUES (1, 'test')")
     
+    def test_add_script_from_file(self):
+        """Тест добавления скрипта из файла."""
+        source_file = os.path.join(self.test_dir, "source.sql")
+        Path(source_file).write_text("SELECT * FROM source", encoding="utf-8")
+        
+        # Содержимое копируется в файл скрипта, исходный файл не используется
+        self.assertTrue(self.searcher.add_script("From File", "files", "", source_file=source_file))
+        script = self.searcher.find_script_by_name("From File")
+        self.assertEqual(script["content"], "SELECT * FROM source")
+        self.assertNotEqual(os.path.abspath(script["path"]), os.path.abspath(source_file))
+        Path(source_file).write_text("SELECT * FROM changed", encoding="utf-8")
+        self.assertEqual(self.searcher.find_script_by_name("From File")["content"], "SELECT * FROM source")
+        
+        # Исходный файл совпадает с файлом скрипта: копирование пропускается
+        self.assertTrue(self.searcher.add_script("Same File", "files", "", script_path=source_file,
+                                                 source_file=source_file))
+        self.assertEqual(self.searcher.find_script_by_name("Same File")["content"], "SELECT * FROM changed")
+        
+        # Несуществующий исходный файл
+        missing_file = os.path.join(self.test_dir, "missing.sql")
+        self.assertFalse(self.searcher.add_script("Missing File", "files", "", source_file=missing_file))
+        self.assertIsNone(self.searcher.find_script_by_name("Missing File"))
+    
+    def test_add_scripts(self):
+        """Тест пакетного добавления скриптов."""
+        added = self.searcher.add_scripts([
+            {"name": "Bulk 1", "category": "bulk", "description": "d1", "script_content": "SELECT 1"},
+            {"name": "Bulk 2", "category": "bulk", "description": "d2", "script_content": "SELECT 2"},
+            {"name": "Test Script 1", "category": "bulk", "description": "dup", "script_content": "SELECT 3"},
+        ])
+        
+        # Дубликат пропускается, остальные скрипты добавлены с общей меткой времени
+        self.assertEqual(added, 2)
+        scripts = self.searcher.find_scripts_by_category("bulk")
+        self.assertEqual([s["content"] for s in scripts], ["SELECT 1", "SELECT 2"])
+        self.assertEqual(scripts[0]["created_at"], scripts[1]["created_at"])
+        
+        # Метаданные сохранены на диск
+        reloaded = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir)
+        self.assertIsNotNone(reloaded.find_script_by_name("Bulk 2"))
+    
+    def test_background_save(self):
+        """Тест фоновой записи метаданных."""
+        searcher = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir,
+                               background_save=True)
+        
+        for i in range(5):
+            self.assertTrue(searcher.add_script(f"Background {i}", "background", "", f"SELECT {i}"))
+        searcher.flush()
+        
+        reloaded = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir)
+        self.assertEqual(len(reloaded.find_scripts_by_category("background")), 5)
+        
+        # close останавливает поток записи, дальнейшие изменения записываются сразу
+        writer = searcher._writer
+        searcher.close()
+        self.assertFalse(writer.is_alive())
+        self.assertTrue(searcher.add_script("Background 5", "background", "", "SELECT 5"))
+        reloaded = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir)
+        self.assertEqual(len(reloaded.find_scripts_by_category("background")), 6)
+    
+    def test_save_retry_after_error(self):
+        """Тест повторного сохранения метаданных после ошибки записи."""
+        tmp_file = f"{self.metadata_file}.tmp"
+        os.mkdir(tmp_file)
+        with self.assertRaises(OSError):
+            self.searcher.add_script("Retry", "retry", "", "SELECT 1")
+        os.rmdir(tmp_file)
+        
+        # Те же метаданные записываются при следующем сохранении
+        self.searcher._save_metadata()
+        reloaded = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir)
+        self.assertIsNotNone(reloaded.find_script_by_name("Retry"))
+    
+    def test_background_save_error(self):
+        """Тест передачи ошибки фоновой записи через flush."""
+        metadata_file = os.path.join(self.test_dir, "missing_dir", "metadata.json")
+        searcher = SqlSearcher(metadata_file=metadata_file, scripts_dir=self.scripts_dir,
+                               background_save=True)
+        
+        searcher.add_script("Background", "background", "", "SELECT 1")
+        with self.assertRaises(OSError):
+            searcher.flush()
+        
+        # Ошибка сообщается один раз
+        searcher.flush()
+        searcher.close()
+    
+    def test_close_unused_background_save(self):
+        """Тест закрытия SqlSearcher, который еще не сохранял метаданные."""
+        searcher = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir,
+                               background_save=True)
+        searcher.close()
+        
+        # Поток записи не запускается, метаданные записываются сразу
+        self.assertTrue(searcher.add_script("After Close", "background", "", "SELECT 1"))
+        self.assertIsNone(searcher._writer)
+        reloaded = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir)
+        self.assertIsNotNone(reloaded.find_script_by_name("After Close"))
+    
     def test_find_script_by_name(self):
         """Тест поиска скрипта по имени."""
         # Ищем существующий скрипт
@@ -83,6 +183,25 @@ class TestSqlSearcher(unittest.TestCase):
         script = self.searcher.find_script_by_name("Nonexistent Script")
         self.assertIsNone(script)
     
+    def test_complete_script_names(self):
+        """Тест автодополнения названий скриптов по префиксу."""
+        self.assertEqual(self.searcher.complete_script_names("Test"),
+                         ["Test Script 1", "Test Script 2"])
+        self.assertEqual(self.searcher.complete_script_names(""),
+                         ["Another Script", "Test Script 1", "Test Script 2"])
+        self.assertEqual(self.searcher.complete_script_names("Nonexistent"), [])
+        
+        # Список названий следует за добавлением и удалением скриптов
+        self.searcher.add_script(
+            name="Test Script 0",
+            category="test",
+            description="Test description 0",
+            script_content="SELECT 0"
+        )
+        self.searcher.delete_script("Test Script 2")
+        self.assertEqual(self.searcher.complete_script_names("Test"),
+                         ["Test Script 0", "Test Script 1"])
+    
     def test_find_scripts_by_category(self):
         """Тест поиска скриптов по категории."""
         # Ищем скрипты в существующей категории
@@ -97,6 +216,12 @@ class TestSqlSearcher(unittest.TestCase):
         """Тест получения всех скриптов."""
         scripts = self.searcher.get_all_scripts()
         self.assertEqual(len(scripts), 3)
+        self.assertEqual(scripts[0]["content"], "SELECT * FROM test WHERE id = 1")
+        
+        # Без содержимого файлы не читаются
+        scripts = self.searcher.get_all_scripts(include_content=False)
+        self.assertEqual([s["name"] for s in scripts], ["Test Script 1", "Test Script 2", "Another Script"])
+        self.assertNotIn("content", scripts[0])
     
     def test_get_all_categories(self):
         """Тест получения всех категорий."""
@@ -114,6 +239,23 @@ class TestSqlSearcher(unittest.TestCase):
         # Проверяем, что скрипт удален
         script = self.searcher.find_script_by_name("Test Script 1")
         self.assertIsNone(script)
+        self.assertEqual(len(self.searcher.find_scripts_by_category("test")), 1)
+        
+        # Порядок оставшихся скриптов совпадает с порядком после перезагрузки
+        self.searcher.add_script("Test Script 3", "test", "", "SELECT 3")
+        self.searcher.add_script("Test Script 4", "test", "", "SELECT 4")
+        self.searcher.delete_script("Test Script 2")
+        reloaded = SqlSearcher(metadata_file=self.metadata_file, scripts_dir=self.scripts_dir)
+        for searcher in (self.searcher, reloaded):
+            self.assertEqual([s["name"] for s in searcher.get_all_scripts(include_content=False)],
+                             ["Another Script", "Test Script 3", "Test Script 4"])
+            self.assertEqual([s["name"] for s in searcher.find_scripts_by_category("test")],
+                             ["Test Script 3", "Test Script 4"])
+            self.assertEqual(searcher.find_script_by_name("Test Script 4")["content"], "SELECT 4")
+        
+        # Удаление последнего скрипта категории удаляет и категорию
+        self.searcher.delete_script("Another Script")
+        self.assertEqual(self.searcher.get_all_categories(), ["test"])
         
         # Удаляем несуществующий скрипт
         result = self.searcher.delete_script("Nonexistent Script")
@@ -134,6 +276,46 @@ class TestSqlSearcher(unittest.TestCase):
         scripts = self.searcher.search_in_scripts("description 2")
         self.assertEqual(len(scripts), 1)
         self.assertEqual(scripts[0]["name"], "Test Script 2")
+        
+        # Поиск без чтения содержимого найденных скриптов
+        scripts = self.searcher.search_in_scripts("id = 1", include_content=False)
+        self.assertEqual(len(scripts), 2)
+        self.assertNotIn("content", scripts[0])
+    
+    def test_search_index_follows_changes(self):
+        """Тест актуальности поискового индекса после изменения скриптов."""
+        # Поиск перебором и поиск по индексу дают одинаковый результат
+        self.assertEqual(len(self.searcher.search_in_scripts("id = 1")), 2)
+        self.searcher.build_search_index()
+        self.assertEqual(len(self.searcher.search_in_scripts("id = 1")), 2)
+        
+        # Обновленное содержимое находится, прежнее - нет
+        self.searcher.update_script("Test Script 1", "SELECT * FROM test WHERE id = 42")
+        scripts = self.searcher.search_in_scripts("id = 42")
+        self.assertEqual([s["name"] for s in scripts], ["Test Script 1"])
+        self.assertEqual(len(self.searcher.search_in_scripts("id = 1")), 1)
+        
+        # Удаленный скрипт больше не находится
+        self.searcher.delete_script("Another Script")
+        self.assertEqual(len(self.searcher.search_in_scripts("id = 1")), 0)
+        
+        # Добавленный скрипт находится без перестроения индекса
+        self.searcher.add_script(
+            name="Fresh Script",
+            category="test",
+            description="Fresh description",
+            script_content="DELETE FROM test WHERE id = 1"
+        )
+        scripts = self.searcher.search_in_scripts("delete from")
+        self.assertEqual([s["name"] for s in scripts], ["Fresh Script"])
+        
+        # Изменение файла в обход SqlSearcher тоже попадает в индекс
+        path = Path(self.searcher.find_script_by_name("Test Script 2")["path"])
+        path.write_text("SELECT * FROM external_table WHERE id = 1", encoding="utf-8")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+        scripts = self.searcher.search_in_scripts("external_table")
+        self.assertEqual([s["name"] for s in scripts], ["Test Script 2"])
+        self.assertEqual(self.searcher.search_in_scripts("name = 'test'"), [])
     
     def test_update_script(self):
         """Тест обновления скрипта."""
@@ -151,9 +333,65 @@ class TestSqlSearcher(unittest.TestCase):
         versions = self.searcher.get_script_history("Test Script 1")
         self.assertEqual(len(versions), 2)
         
+        # Повторное обновление тем же содержимым не создает новую версию
+        self.assertTrue(self.searcher.update_script("Test Script 1", new_content))
+        self.assertEqual(self.searcher.find_script_by_name("Test Script 1")["version"], 2)
+        
         # Обновляем несуществующий скрипт
         result = self.searcher.update_script("Nonexistent Script", "SELECT 1")
         self.assertFalse(result)
+    
+    def test_update_script_from_file(self):
+        """Тест обновления скрипта из файла."""
+        source_file = os.path.join(self.test_dir, "source.sql")
+        Path(source_file).write_text("SELECT * FROM source", encoding="utf-8")
+        
+        # Новое содержимое копируется из файла, прежнее попадает в историю
+        self.assertTrue(self.searcher.update_script("Test Script 1", source_file=source_file))
+        script = self.searcher.find_script_by_name("Test Script 1")
+        self.assertEqual(script["content"], "SELECT * FROM source")
+        self.assertEqual(script["version"], 2)
+        versions = self.searcher.get_script_history("Test Script 1")
+        self.assertEqual([v["content"] for v in versions],
+                         ["SELECT * FROM test WHERE id = 1", "SELECT * FROM source"])
+        
+        # Повторное обновление из неизмененного файла не создает новую версию
+        self.assertTrue(self.searcher.update_script("Test Script 1", source_file=source_file))
+        self.assertEqual(self.searcher.find_script_by_name("Test Script 1")["version"], 2)
+        self.assertEqual(len(self.searcher.get_script_history("Test Script 1")), 2)
+        
+        # Исходный файл совпадает с файлом скрипта: содержимое не изменилось
+        self.assertTrue(self.searcher.update_script("Test Script 1", source_file=script["path"]))
+        self.assertEqual(self.searcher.find_script_by_name("Test Script 1")["version"], 2)
+        
+        # Измененный файл создает новую версию
+        Path(source_file).write_text("SELECT * FROM source WHERE id = 1", encoding="utf-8")
+        self.assertTrue(self.searcher.update_script("Test Script 1", source_file=source_file))
+        script = self.searcher.find_script_by_name("Test Script 1")
+        self.assertEqual(script["content"], "SELECT * FROM source WHERE id = 1")
+        self.assertEqual(script["version"], 3)
+        
+        # Несуществующий исходный файл
+        missing_file = os.path.join(self.test_dir, "missing.sql")
+        self.assertFalse(self.searcher.update_script("Test Script 1", source_file=missing_file))
+        self.assertEqual(self.searcher.find_script_by_name("Test Script 1")["version"], 3)
+    
+    def test_content_cache_invalidation(self):
+        """Тест перечитывания файла скрипта, измененного в обход SqlSearcher."""
+        path = Path(self.searcher.find_script_by_name("Test Script 1")["path"])
+        stat = path.stat()
+        
+        # Размер тот же, изменилось время изменения
+        path.write_text("SELECT * FROM test WHERE id = 2", encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(self.searcher.find_script_by_name("Test Script 1")["content"],
+                         "SELECT * FROM test WHERE id = 2")
+        
+        # Время изменения то же, изменился размер
+        path.write_text("SELECT * FROM test WHERE id = 10", encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(self.searcher.find_script_by_name("Test Script 1")["content"],
+                         "SELECT * FROM test WHERE id = 10")
 
 
 if __name__ == "__main__":